@@ -4,8 +4,8 @@ import os
 from keras.optimizer_v2.gradient_descent import SGD
 
 from src.encoders.maze_and_robot_positioning_encoder import MazeAndRobotPositioningEncoder
-from src.robot_reboot.classic_robot_reboot_hash import ClassicRobotRebootZobristHash
 from src.robot_reboot.factory import RobotRebootFactory
+from src.robot_reboot.util import get_zobrish_hash
 from src.robot_reboot.model import get_model_v2
 
 
@@ -15,7 +15,7 @@ def create_model(model_path, model_name):
     # This configuration does not matter much at this stage. It is only to generate the encoder correctly
     game, game_state, selected_quadrants = factory.create(31, locate_robot_close_goal=True,
                                                           n_movements=20,
-                                                          zobrist_hash_generator=ClassicRobotRebootZobristHash(),
+                                                          zobrist_hash_generator=get_zobrish_hash(4, (31, 31)),
                                                           move_all_robots=True)
     encoder = MazeAndRobotPositioningEncoder(game)
     model = get_model_v2(encoder.shape(), len(game.actions))
@@ -1,61 +1,171 @@
 import argparse
 import logging
+import multiprocessing
 import os
 import sys
 import uuid
+from concurrent.futures import ThreadPoolExecutor
 
 import h5py
 import keras.models
 import numpy as np
 
-from src.agent.alphazero import AlphaZeroAgent
+from src.agent.alphazero import AlphaZeroAgent, SearchStats
+from src.agent.evaluation_cache import EvaluationCache
+from src.agent.inference_server import InferenceServer
 from src.encoders.maze_and_robot_positioning_encoder import MazeAndRobotPositioningEncoder
 from src.experience.alphazero_experience import AlphaZeroExperienceCollector
 from src.game_simulator.base import simulate_game
-from src.robot_reboot.classic_robot_reboot_hash import ClassicRobotRebootZobristHash
 from src.robot_reboot.factory import RobotRebootFactory
+from src.robot_reboot.util import get_zobrish_hash
 
 logging.getLogger().setLevel(logging.INFO)
 
 
 def self_play(path_to_model, path_to_results, seed, number_games, rounds_per_action, locate_robot_close_goal,
               max_movements,
-              max_actions_per_game):
+              max_actions_per_game, leaf_batch_size=1, reuse_tree=True, evaluation_cache_size=0,
+              path_to_evaluation_cache=None, concurrent_games=1, inference_batch_size=None, workers=1,
+              self_play_id=None, time_budget=None, node_budget=None, early_stop=False,
+              transpositions=False, profile=False):
     assert os.path.isdir(path_to_results)
     assert os.path.isdir(path_to_model)
-    logging.info('Loading model ' + path_to_model)
-    model = keras.models.load_model(path_to_model)
+    if self_play_id is None:
+        self_play_id = str(uuid.uuid4().time)[:8]
+    logging.info(f'Self play id {self_play_id}')
+    settings = {
+        'path_to_model': path_to_model,
+        'path_to_results': path_to_results,
+        'self_play_id': self_play_id,
+        'seed': seed,
+        'number_games': number_games,
+        'rounds_per_action': rounds_per_action,
+        'locate_robot_close_goal': locate_robot_close_goal,
+        'max_movements': max_movements,
+        'max_actions_per_game': max_actions_per_game,
+        'leaf_batch_size': leaf_batch_size,
+        'reuse_tree': reuse_tree,
+        'evaluation_cache_size': evaluation_cache_size,
+        'path_to_evaluation_cache': path_to_evaluation_cache,
+        'concurrent_games': concurrent_games,
+        'inference_batch_size': inference_batch_size,
+        'time_budget': time_budget,
+        'node_budget': node_budget,
+        'early_stop': early_stop,
+        'transpositions': transpositions,
+        'profile': profile,
+    }
+    games = [i for i in range(number_games) if not os.path.exists(get_experience_file_name(settings, i))]
+    if len(games) < number_games:
+        logging.info(f'Skipping {number_games - len(games)} games already played')
 
-    np.random.seed(seed)
-    factory = RobotRebootFactory()
+    if workers > 1:
+        shards = [games[w::workers] for w in range(workers)]
+        context = multiprocessing.get_context('spawn')
+        with context.Pool(workers, initializer=init_worker, initargs=(path_to_model,)) as pool:
+            pool.starmap(play_games_in_worker, [(shard, settings) for shard in shards if shard])
+    else:
+        logging.info('Loading model ' + path_to_model)
+        model = keras.models.load_model(path_to_model)
+        play_games(model, games, settings, save_evaluation_cache=True)
+
+
+def get_game_seed(seed, i):
+    """Seed of the i-th game, it only depends on the base seed and the game so every game is the same no matter how
+    games are distributed"""
+    return int(np.random.SeedSequence([seed, i]).generate_state(1)[0])
+
+
+def get_experience_file_name(settings, i):
+    return f'{settings["path_to_results"]}/experience-{i}-{settings["self_play_id"]}.hdf5'
+
+
+def create_game_state(settings, i):
+    np.random.seed(get_game_seed(settings['seed'], i))
+    max_movements = settings['max_movements']
     if max_movements:
-        n_movement_choices = [i for i in range(1, max_movements + 1)]
-    self_play_id = str(uuid.uuid4().time)[:8]
-    logging.info(f'Self play id {self_play_id}')
-    for i in range(number_games):
-        logging.info('Starting game ' + str(i + 1) + '/' + str(number_games))
-        if max_movements:
-            n_movements = np.random.choice(n_movement_choices)
-        else:
-            n_movements = None
-        game, game_state, selected_quadrants = factory.create(31, locate_robot_close_goal=locate_robot_close_goal,
-                                                              n_movements=n_movements,
-                                                              zobrist_hash_generator=ClassicRobotRebootZobristHash(),
-                                                              move_all_robots=True)
-        encoder = MazeAndRobotPositioningEncoder(game)
-        collector = AlphaZeroExperienceCollector()
-        alphazero_agent = AlphaZeroAgent(model, encoder, rounds_per_action=rounds_per_action, collector=collector)
-        final_state = simulate_game(game_state, alphazero_agent, collector, max_actions=max_actions_per_game)
-
-        value = final_state.get_value()
-        total_actions = final_state.sequence_i
-        logging.info('Finished game ' + str(i + 1) + '/' + str(number_games) +
-                     '\nValue= ' + str(value) +
-                     '\nTotal actions = ' + str(total_actions))
-        buffer = collector.to_buffer()
-        experience_file_name = f'{path_to_results}/experience-{i}-{self_play_id}.hdf5'
-        with h5py.File(experience_file_name, 'w') as experience_out:
-            buffer.serialize(experience_out)
+        n_movements = np.random.choice([i for i in range(1, max_movements + 1)])
+    else:
+        n_movements = None
+    factory = RobotRebootFactory()
+    game, game_state, selected_quadrants = factory.create(31,
+                                                          locate_robot_close_goal=settings['locate_robot_close_goal'],
+                                                          n_movements=n_movements,
+                                                          zobrist_hash_generator=get_zobrish_hash(4, (31, 31)),
+                                                          move_all_robots=True)
+    return game_state
+
+
+def play_games(model, games, settings, save_evaluation_cache=False):
+    """Plays the games one after another or, if concurrent_games > 1, at the same time in threads sharing an inference
+    server"""
+    evaluation_cache = None
+    path_to_evaluation_cache = settings['path_to_evaluation_cache']
+    if settings['evaluation_cache_size'] > 0:
+        evaluation_cache = EvaluationCache(max_size=settings['evaluation_cache_size'])
+        if path_to_evaluation_cache:
+            logging.info(f'Loaded {evaluation_cache.load(path_to_evaluation_cache)} evaluations')
+
+    # Games are created before playing because the factory uses the global random generator
+    game_states = [create_game_state(settings, i) for i in games]
+    concurrent_games = settings['concurrent_games']
+    if concurrent_games > 1:
+        max_batch_size = settings['inference_batch_size'] or concurrent_games * settings['leaf_batch_size']
+        with InferenceServer(model, max_batch_size=max_batch_size) as server:
+            with ThreadPoolExecutor(max_workers=concurrent_games) as executor:
+                list(executor.map(play_game, [server] * len(games), games, game_states, [settings] * len(games),
+                                  [evaluation_cache] * len(games)))
+        logging.info(f'Inference server: {server}')
+    else:
+        for i, game_state in zip(games, game_states):
+            play_game(model, i, game_state, settings, evaluation_cache)
+
+    if evaluation_cache is not None:
+        logging.info(f'Evaluation cache: {evaluation_cache}')
+        if save_evaluation_cache and path_to_evaluation_cache:
+            evaluation_cache.save(path_to_evaluation_cache)
+
+
+def play_game(model, i, game_state, settings, evaluation_cache):
+    number_games = settings['number_games']
+    logging.info('Starting game ' + str(i + 1) + '/' + str(number_games))
+    encoder = MazeAndRobotPositioningEncoder(game_state.game)
+    collector = AlphaZeroExperienceCollector()
+    alphazero_agent = AlphaZeroAgent(model, encoder, rounds_per_action=settings['rounds_per_action'],
+                                     collector=collector, leaf_batch_size=settings['leaf_batch_size'],
+                                     reuse_tree=settings['reuse_tree'], evaluation_cache=evaluation_cache,
+                                     model_id=settings['path_to_model'], time_budget=settings['time_budget'],
+                                     node_budget=settings['node_budget'], early_stop=settings['early_stop'],
+                                     transpositions=settings['transpositions'], profile=settings['profile'])
+    search_stats = SearchStats()
+    final_state = simulate_game(game_state, alphazero_agent, collector,
+                                max_actions=settings['max_actions_per_game'], search_stats=search_stats)
+
+    value = final_state.get_value()
+    total_actions = final_state.sequence_i
+    logging.info('Finished game ' + str(i + 1) + '/' + str(number_games) +
+                 '\nValue= ' + str(value) +
+                 '\nTotal actions = ' + str(total_actions))
+    buffer = collector.to_buffer()
+    experience_file_name = get_experience_file_name(settings, i)
+    # The file is written under a temporary name so an interrupted game is played again when the run is resumed
+    with h5py.File(experience_file_name + '.tmp', 'w') as experience_out:
+        buffer.serialize(experience_out)
+    os.replace(experience_file_name + '.tmp', experience_file_name)
+
+
+worker_model = None
+
+
+def init_worker(path_to_model):
+    global worker_model
+    logging.getLogger().setLevel(logging.INFO)
+    logging.info('Loading model ' + path_to_model)
+    worker_model = keras.models.load_model(path_to_model)
+
+
+def play_games_in_worker(games, settings):
+    play_games(worker_model, games, settings)
 
 
 if __name__ == '__main__':
@@ -81,8 +191,10 @@ if __name__ == '__main__':
     parser.add_argument(
         '--rounds_per_action',
         type=int,
-        required=True,
-        help='Number of states explore before picking an action'
+        required=False,
+        default=None,
+        help='Number of states explore before picking an action, unbounded by default so a time or node budget is '
+             'needed'
     )
     parser.add_argument(
         '--max_movements',
@@ -104,11 +216,104 @@ if __name__ == '__main__':
         default=sys.maxsize,
         help='Maximum number of actions one single game can have'
     )
+    parser.add_argument(
+        '--leaf_batch_size',
+        type=int,
+        required=False,
+        default=1,
+        help='Number of leaves evaluated together in a single model call while exploring states'
+    )
+    parser.add_argument(
+        '--disable_tree_reuse',
+        action='store_true',
+        help='Build a new search tree for every action instead of keeping the subtree of the selected action'
+    )
+    parser.add_argument(
+        '--evaluation_cache_size',
+        type=int,
+        required=False,
+        default=0,
+        help='Max number of model evaluations cached across games, no cache is used if 0'
+    )
+    parser.add_argument(
+        '--path_to_evaluation_cache',
+        type=str,
+        required=False,
+        default=None,
+        help='File the evaluation cache is loaded from and saved to, it must belong to the same model'
+    )
+    parser.add_argument(
+        '--concurrent_games',
+        type=int,
+        required=False,
+        default=1,
+        help='Number of games played at the same time sharing a batched inference server'
+    )
+    parser.add_argument(
+        '--inference_batch_size',
+        type=int,
+        required=False,
+        default=None,
+        help='Max number of states evaluated together by the inference server, concurrent_games * leaf_batch_size '
+             'by default'
+    )
+    parser.add_argument(
+        '--workers',
+        type=int,
+        required=False,
+        default=1,
+        help='Number of processes playing games, each one loads the model. The evaluation cache is only saved with '
+             'one worker'
+    )
+    parser.add_argument(
+        '--self_play_id',
+        type=str,
+        required=False,
+        default=None,
+        help='Id of the results files, games whose results already exist are skipped so a run can be resumed with '
+             'its id. A new id is generated by default'
+    )
+    parser.add_argument(
+        '--time_budget',
+        type=float,
+        required=False,
+        default=None,
+        help='Max seconds spent exploring states before picking an action, it stops earlier than rounds_per_action '
+             'when reached'
+    )
+    parser.add_argument(
+        '--node_budget',
+        type=int,
+        required=False,
+        default=None,
+        help='Max number of states added to the search tree before picking an action'
+    )
+    parser.add_argument(
+        '--early_stop',
+        action='store_true',
+        help='Stop exploring states when the rounds left can not change the most visited action'
+    )
+    parser.add_argument(
+        '--transpositions',
+        action='store_true',
+        help='Share the search node of states reached by different sequences of actions'
+    )
+    parser.add_argument(
+        '--profile',
+        action='store_true',
+        help='Measure the time spent in every phase of the search, it is logged at the end of every game'
+    )
 
     args = parser.parse_args()
+    if args.rounds_per_action is None and args.time_budget is None and args.node_budget is None:
+        parser.error('at least one of --rounds_per_action, --time_budget and --node_budget is required')
     locate_robot_close_goal = args.max_movements is not None
 
     self_play(args.path_to_model, args.path_to_results, args.seed, args.number_games, args.rounds_per_action,
-              locate_robot_close_goal, args.max_movements, args.max_actions_per_game)
+              locate_robot_close_goal, args.max_movements, args.max_actions_per_game, args.leaf_batch_size,
+              not args.disable_tree_reuse, args.evaluation_cache_size, args.path_to_evaluation_cache,
+              args.concurrent_games, args.inference_batch_size, args.workers, args.self_play_id,
+              args.time_budget, args.node_budget, args.early_stop, args.transpositions,
+              args.profile)
 
     # self_play('models/model_0', 'model_0', 26, 1, 50, True, 1, 2)
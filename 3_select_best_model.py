@@ -9,18 +9,22 @@ import keras.models
 import numpy as np
 import pandas as pd
 
-from src.agent.alphazero import AlphaZeroAgent
+from src.agent.alphazero import AlphaZeroAgent, SearchStats
+from src.agent.evaluation_cache import EvaluationCache
+from src.agent.root_parallel import RootParallelAlphaZeroAgent
 from src.encoders.maze_and_robot_positioning_encoder import MazeAndRobotPositioningEncoder
 from src.experience.alphazero_experience import AlphaZeroExperienceCollector
 from src.game_simulator.base import simulate_game
-from src.robot_reboot.classic_robot_reboot_hash import ClassicRobotRebootZobristHash
 from src.robot_reboot.factory import RobotRebootFactory
+from src.robot_reboot.util import get_zobrish_hash
 
 logging.getLogger().setLevel(logging.INFO)
 
 
 def self_play(path_to_models, model_names, path_to_results, seed, number_games, rounds_per_action,
-              locate_robot_close_goal, max_movements, max_actions_per_game):
+              locate_robot_close_goal, max_movements, max_actions_per_game, leaf_batch_size=1, reuse_tree=True,
+              evaluation_cache_size=0, time_budget=None, node_budget=None, early_stop=False,
+              transpositions=False, search_workers=1):
     logging.info('path to models ' + str(path_to_models))
     logging.info('model_names ' + str(model_names))
     assert len(path_to_models) == len(model_names)
@@ -29,8 +33,9 @@ def self_play(path_to_models, model_names, path_to_results, seed, number_games,
     for path_to_model in path_to_models:
         assert os.path.isdir(path_to_model)
 
-    logging.info('Loading models')
-    models = [keras.models.load_model(path_to_model) for path_to_model in path_to_models]
+    if search_workers == 1:
+        logging.info('Loading models')
+        models = [keras.models.load_model(path_to_model) for path_to_model in path_to_models]
 
     np.random.seed(seed)
     factory = RobotRebootFactory()
@@ -38,7 +43,18 @@ def self_play(path_to_models, model_names, path_to_results, seed, number_games,
         n_movement_choices = [i for i in range(1, max_movements + 1)]
 
     collectors = [AlphaZeroExperienceCollector() for _ in path_to_models]
+    evaluation_cache = EvaluationCache(max_size=evaluation_cache_size) if evaluation_cache_size > 0 else None
     wins = [0 for _ in path_to_models]
+    search_agents = None
+    if search_workers > 1:
+        # The worker processes of every model load it once and search the states of all the games
+        search_agents = [RootParallelAlphaZeroAgent(path_to_model, None, workers=search_workers,
+                                                    collector=collectors[j], seed=seed,
+                                                    rounds_per_action=rounds_per_action,
+                                                    leaf_batch_size=leaf_batch_size, time_budget=time_budget,
+                                                    node_budget=node_budget, early_stop=early_stop,
+                                                    transpositions=transpositions)
+                         for j, path_to_model in enumerate(path_to_models)]
 
     results = list()
 
@@ -51,13 +67,24 @@ def self_play(path_to_models, model_names, path_to_results, seed, number_games,
 
         game, game_state, selected_quadrants = factory.create(31, locate_robot_close_goal=locate_robot_close_goal,
                                                               n_movements=n_movements,
-                                                              zobrist_hash_generator=ClassicRobotRebootZobristHash(),
+                                                              zobrist_hash_generator=get_zobrish_hash(4, (31, 31)),
                                                               move_all_robots=True)
         encoder = MazeAndRobotPositioningEncoder(game)
-        for j, model in enumerate(models):
+        for j in range(len(path_to_models)):
             collector = collectors[j]
-            alphazero_agent = AlphaZeroAgent(model, encoder, rounds_per_action=rounds_per_action, collector=collector)
-            final_state = simulate_game(game_state, alphazero_agent, collector, max_actions=max_actions_per_game)
+            if search_agents is not None:
+                alphazero_agent = search_agents[j]
+                alphazero_agent.encoder = encoder
+            else:
+                alphazero_agent = AlphaZeroAgent(models[j], encoder, rounds_per_action=rounds_per_action,
+                                                collector=collector, leaf_batch_size=leaf_batch_size,
+                                                reuse_tree=reuse_tree, evaluation_cache=evaluation_cache,
+                                                model_id=model_names[j], time_budget=time_budget,
+                                                node_budget=node_budget, early_stop=early_stop,
+                                                transpositions=transpositions)
+            search_stats = SearchStats()
+            final_state = simulate_game(game_state, alphazero_agent, collector, max_actions=max_actions_per_game,
+                                        search_stats=search_stats)
             value = final_state.get_value()
             total_actions = final_state.sequence_i
             result = {
@@ -67,16 +94,27 @@ def self_play(path_to_models, model_names, path_to_results, seed, number_games,
                 'locate_robot_close_goal': locate_robot_close_goal,
                 'n_movements': n_movements,
                 'max_actions_per_game': max_actions_per_game,
+                'leaf_batch_size': leaf_batch_size,
+                'time_budget': time_budget,
+                'node_budget': node_budget,
+                'early_stop': early_stop,
+                'transpositions': transpositions,
+                'search_workers': search_workers,
                 'game': i + 1,
                 'model': model_names[j],
                 'value': value,
                 'total_actions': total_actions,
+                'rounds': search_stats.rounds,
+                'simulations_per_second': search_stats.simulations_per_second,
             }
             results.append(result)
             wins[j] += value
             logging.info('Model ' + model_names[j] + ' finished game ' + str(i + 1) + '/' + str(number_games))
             logging.info("{value = " + str(value) + "# actions = " + str(total_actions) + "}")
 
+    for search_agent in search_agents or []:
+        search_agent.stop()
+
     for i, collector in enumerate(collectors):
         buffer_1 = collector.to_buffer()
         experience_file_name = f'{path_to_results}/experiences-{model_names[i]}-{competition_id}.hd5f'
@@ -88,6 +126,8 @@ def self_play(path_to_models, model_names, path_to_results, seed, number_games,
     logging.info('Competition' + competition_id + ' concluded')
     for i, win in enumerate(wins):
         logging.info('Model ' + model_names[i] + ' won ' + str(win))
+    if evaluation_cache is not None:
+        logging.info(f'Evaluation cache: {evaluation_cache}')
 
 
 def get_n_movements(max_movements, n_movement_choices):
@@ -136,8 +176,10 @@ if __name__ == '__main__':
     parser.add_argument(
         '--rounds_per_action',
         type=int,
-        required=True,
-        help='Number of states explore before picking an action'
+        required=False,
+        default=None,
+        help='Number of states explore before picking an action, unbounded by default so a time or node budget is '
+             'needed'
     )
     parser.add_argument(
         '--max_movements',
@@ -153,11 +195,67 @@ if __name__ == '__main__':
         default=sys.maxsize,
         help='Maximum number of actions one single game can have'
     )
+    parser.add_argument(
+        '--leaf_batch_size',
+        type=int,
+        required=False,
+        default=1,
+        help='Number of leaves evaluated together in a single model call while exploring states'
+    )
+    parser.add_argument(
+        '--disable_tree_reuse',
+        action='store_true',
+        help='Build a new search tree for every action instead of keeping the subtree of the selected action'
+    )
+    parser.add_argument(
+        '--evaluation_cache_size',
+        type=int,
+        required=False,
+        default=0,
+        help='Max number of model evaluations cached across games, no cache is used if 0'
+    )
+    parser.add_argument(
+        '--time_budget',
+        type=float,
+        required=False,
+        default=None,
+        help='Max seconds spent exploring states before picking an action, it stops earlier than rounds_per_action '
+             'when reached'
+    )
+    parser.add_argument(
+        '--node_budget',
+        type=int,
+        required=False,
+        default=None,
+        help='Max number of states added to the search tree before picking an action'
+    )
+    parser.add_argument(
+        '--early_stop',
+        action='store_true',
+        help='Stop exploring states when the rounds left can not change the most visited action'
+    )
+    parser.add_argument(
+        '--transpositions',
+        action='store_true',
+        help='Share the search node of states reached by different sequences of actions'
+    )
+    parser.add_argument(
+        '--search_workers',
+        type=int,
+        required=False,
+        default=1,
+        help='Number of processes searching every state at the same time, their visits are merged to pick the action'
+    )
 
     args = parser.parse_args()
+    if args.rounds_per_action is None and args.time_budget is None and args.node_budget is None:
+        parser.error('at least one of --rounds_per_action, --time_budget and --node_budget is required')
     locate_robot_close_goal = args.max_movements is not None
 
     self_play([''.join(path_model) for path_model in args.path_to_models],
               [''.join(model_name) for model_name in args.model_names],
               args.path_to_results, args.seed, args.number_games, args.rounds_per_action,
-              locate_robot_close_goal, args.max_movements, args.max_actions_per_game)
+              locate_robot_close_goal, args.max_movements, args.max_actions_per_game, args.leaf_batch_size,
+              not args.disable_tree_reuse, args.evaluation_cache_size,
+              args.time_budget, args.node_budget, args.early_stop, args.transpositions,
+              args.search_workers)
@@ -0,0 +1,96 @@
+import argparse
+import logging
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.robot_reboot.factory import RobotRebootFactory
+
+logging.getLogger().setLevel(logging.INFO)
+
+DEFAULT_SEEDS = list(range(20))
+
+
+def benchmark(seeds, size, n_states, repetitions, path_to_results):
+    factory = RobotRebootFactory()
+    results = list()
+    for seed in seeds:
+        np.random.seed(seed)
+        game, game_state, selected_quadrants = factory.create(size, move_all_robots=True)
+        states = [game_state]
+        while len(states) < n_states:
+            action = game.actions[np.random.randint(0, len(game.actions))]
+            states.append(game.apply(action, states[-1]))
+
+        start = time.time()
+        for _ in range(repetitions):
+            for state in states:
+                for action in game.actions:
+                    game.apply(action, state)
+        apply_time_seconds = time.time() - start
+
+        start = time.time()
+        for _ in range(repetitions):
+            for state in states:
+                game.get_valid_actions_next_state_map(state)
+        valid_actions_time_seconds = time.time() - start
+
+        result = {
+            'seed': seed,
+            'size': size,
+            'applies_per_second': repetitions * len(states) * len(game.actions) / apply_time_seconds,
+            'valid_actions_maps_per_second': repetitions * len(states) / valid_actions_time_seconds,
+        }
+        results.append(result)
+        logging.info(f'Seed {seed}: {result["applies_per_second"]:.0f} applies/s, '
+                     f'{result["valid_actions_maps_per_second"]:.0f} valid actions maps/s')
+
+    df = pd.DataFrame(results)
+    logging.info('\n' + str(df[['applies_per_second', 'valid_actions_maps_per_second']].describe()))
+    if path_to_results:
+        df.to_csv(path_to_results)
+    return df
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        '--seeds',
+        type=int,
+        nargs='+',
+        required=False,
+        default=DEFAULT_SEEDS,
+        help='Values used to generate the games, each seed is one game'
+    )
+    parser.add_argument(
+        '--size',
+        type=int,
+        required=False,
+        default=31,
+        help='Maze size'
+    )
+    parser.add_argument(
+        '--n_states',
+        type=int,
+        required=False,
+        default=50,
+        help='Number of states of each game the moves are resolved on, they are reached with random actions'
+    )
+    parser.add_argument(
+        '--repetitions',
+        type=int,
+        required=False,
+        default=20,
+        help='Number of times the moves of every state are resolved'
+    )
+    parser.add_argument(
+        '--path_to_results',
+        type=str,
+        required=False,
+        default=None,
+        help='CSV file where results will be stored'
+    )
+
+    args = parser.parse_args()
+    benchmark(args.seeds, args.size, args.n_states, args.repetitions, args.path_to_results)
@@ -0,0 +1,117 @@
+import argparse
+import logging
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.robot_reboot.factory import RobotRebootFactory
+from src.robot_reboot.solver import RobotRebootSolver, DEFAULT_MAX_DEPTH
+
+logging.getLogger().setLevel(logging.INFO)
+
+DEFAULT_SEEDS = list(range(20))
+ALGORITHMS = ['bfs', 'ida_star']
+
+
+def benchmark(seeds, size, algorithms, max_depth, locate_robot_close_goal, max_movements, path_to_results,
+              max_nodes=None, timeout=None):
+    factory = RobotRebootFactory()
+    results = list()
+    for seed in seeds:
+        np.random.seed(seed)
+        game, game_state, selected_quadrants = factory.create(size, locate_robot_close_goal=locate_robot_close_goal,
+                                                              n_movements=max_movements, move_all_robots=True)
+        solver = RobotRebootSolver(game, max_depth=max_depth)
+        for algorithm in algorithms:
+            start = time.time()
+            solution = getattr(solver, algorithm)(game_state, max_nodes=max_nodes, timeout=timeout)
+            total_time_seconds = time.time() - start
+            result = {
+                'seed': seed,
+                'size': size,
+                'algorithm': algorithm,
+                'max_depth': max_depth,
+                'solved': solution.solved,
+                'total_actions': len(solution.actions) if solution.solved else None,
+                'nodes_expanded': solution.nodes_expanded,
+                'stop_reason': solution.stop_reason,
+                'time_sec': total_time_seconds,
+            }
+            results.append(result)
+            logging.info(f'Seed {seed} {algorithm}: {solution} in {total_time_seconds:.3f} seconds')
+
+    df = pd.DataFrame(results)
+    logging.info('\n' + str(df.groupby('algorithm')[['nodes_expanded', 'time_sec']].describe()))
+    if path_to_results:
+        df.to_csv(path_to_results)
+    return df
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        '--seeds',
+        type=int,
+        nargs='+',
+        required=False,
+        default=DEFAULT_SEEDS,
+        help='Values used to generate the games, each seed is one game'
+    )
+    parser.add_argument(
+        '--size',
+        type=int,
+        required=False,
+        default=31,
+        help='Maze size'
+    )
+    parser.add_argument(
+        '--algorithms',
+        type=str,
+        nargs='+',
+        required=False,
+        choices=ALGORITHMS,
+        default=ALGORITHMS,
+        help='Search algorithms to benchmark'
+    )
+    parser.add_argument(
+        '--max_depth',
+        type=int,
+        required=False,
+        default=DEFAULT_MAX_DEPTH,
+        help='Max number of actions of a solution'
+    )
+    parser.add_argument(
+        '--max_movements',
+        type=int,
+        required=False,
+        default=None,
+        help='Number of actions the robot is away from its target'
+    )
+    parser.add_argument(
+        '--max_nodes',
+        type=int,
+        required=False,
+        default=None,
+        help='Max number of states expanded to solve each game'
+    )
+    parser.add_argument(
+        '--timeout',
+        type=float,
+        required=False,
+        default=None,
+        help='Max number of seconds to solve each game'
+    )
+    parser.add_argument(
+        '--path_to_results',
+        type=str,
+        required=False,
+        default=None,
+        help='CSV file where results will be stored'
+    )
+
+    args = parser.parse_args()
+    locate_robot_close_goal = args.max_movements is not None
+
+    benchmark(args.seeds, args.size, args.algorithms, args.max_depth, locate_robot_close_goal, args.max_movements,
+              args.path_to_results, max_nodes=args.max_nodes, timeout=args.timeout)
@@ -12,15 +12,15 @@ from src.agent.alphazero import AlphaZeroAgent
 from src.encoders.maze_and_robot_positioning_encoder import MazeAndRobotPositioningEncoder
 from src.experience.alphazero_experience import AlphaZeroExperienceCollector
 from src.game_simulator.base import simulate_game
-from src.robot_reboot.classic_robot_reboot_hash import ClassicRobotRebootZobristHash
 from src.robot_reboot.factory import RobotRebootFactory
+from src.robot_reboot.util import get_zobrish_hash
 from src.robot_reboot.model import get_model_v2
 
 logging.getLogger().setLevel(logging.INFO)
 
 
 def experiment(seed, number_games, rounds_per_action, locate_robot_close_goal, max_movements,
-               max_actions_per_game):
+               max_actions_per_game, leaf_batch_size=1):
     np.random.seed(seed)
     factory = RobotRebootFactory()
     results = list()
@@ -33,14 +33,15 @@ def experiment(seed, number_games, rounds_per_action, locate_robot_close_goal, m
         n_movements = np.random.choice(n_movement_choices)
         game, game_state, selected_quadrants = factory.create(31, locate_robot_close_goal=locate_robot_close_goal,
                                                               n_movements=n_movements,
-                                                              zobrist_hash_generator=ClassicRobotRebootZobristHash(),
+                                                              zobrist_hash_generator=get_zobrish_hash(4, (31, 31)),
                                                               move_all_robots=True)
         encoder = MazeAndRobotPositioningEncoder(game)
         model = get_model_v2(encoder.shape(), len(game.actions))
         model.compile(
             SGD(learning_rate=0.01),
             loss=['categorical_crossentropy', 'mse'])
-        alphazero_agent = AlphaZeroAgent(model, encoder, rounds_per_action=rounds_per_action)
+        alphazero_agent = AlphaZeroAgent(model, encoder, rounds_per_action=rounds_per_action,
+                                        leaf_batch_size=leaf_batch_size)
         collector = AlphaZeroExperienceCollector()
         final_state = simulate_game(game_state, alphazero_agent, collector, max_actions=max_actions_per_game)
         total_time_seconds = time.time() - start
@@ -58,6 +59,7 @@ def experiment(seed, number_games, rounds_per_action, locate_robot_close_goal, m
             'locate_robot_close_goal': locate_robot_close_goal,
             'n_movements': n_movements,
             'max_actions_per_game': max_actions_per_game,
+            'leaf_batch_size': leaf_batch_size,
             'time_sec': total_time_seconds,
             'value': value,
             'total_actions': total_actions,
@@ -105,8 +107,16 @@ if __name__ == '__main__':
         help='Maximum number of actions one single game can have'
     )
 
+    parser.add_argument(
+        '--leaf_batch_size',
+        type=int,
+        required=False,
+        default=1,
+        help='Number of leaves evaluated together in a single model call while exploring states'
+    )
+
     args = parser.parse_args()
     locate_robot_close_goal = args.max_movements is not None
 
     experiment(args.seed, args.number_games, args.rounds_per_action, locate_robot_close_goal, args.max_movements,
-                args.max_actions_per_game)
+                args.max_actions_per_game, args.leaf_batch_size)
@@ -1,44 +1,99 @@
+import time
+
 import numpy as np
 
 __all__ = [
     'AlphaZeroAgent',
+    'SearchStats',
 ]
 
 from keras.optimizer_v2.gradient_descent import SGD
 from tensorflow import keras
 
+from src.agent.array_tree import AlphaZeroArrayTree
 from src.agent.base import Agent
+from src.agent.evaluation_cache import get_evaluation_key
+from src.exceptions.alphazero.agent import UnboundedSearchException
+from src.exceptions.util import assert_or_throw
+
+# Value of a state where the game was won
+WIN_VALUE = 1
+# Nodes up to this number of actions from the root keep the model input of their state, so when they become the root
+# of a later search the decision is recorded without encoding the state again
+ENCODED_STATE_MAX_DEPTH = 2
+
+
+def no_clock():
+    """Clock used when the search isn't profiled"""
+    return 0.0
 
 
 class Branch:
-    def __init__(self, prior, next_state):
+    __slots__ = ('prior', 'visit_count', 'total_value', 'next_state')
+
+    def __init__(self, prior):
         self.prior = prior
         self.visit_count = 0
         self.total_value = 0.0
-        self.next_state = next_state
+        self.next_state = None
 
 
 class AlphaZeroTreeNode:
-    def __init__(self, state, value, priors, parent, last_action):
+    __slots__ = ('state', 'value', 'parent', 'last_action', 'total_visit_count', 'branches', 'children',
+                 'proven_value', 'proven_depth', 'encoded_state')
+
+    def __init__(self, state, value, priors, parent, last_action, terminal=False):
+        """Initializes a node
+        Args:
+            state       (GameState):         state of the node
+            value       (float):             value of the state, predicted or given by the game if terminal
+            priors      (np array):          prior of every action id, not used if terminal
+            parent      (AlphaZeroTreeNode): parent of the node, None for the root
+            last_action (Action):            action that leads from the parent to the node
+            terminal    (bool):              whether the game is over or there are no valid actions, the node has no
+                                             branches and its value is proven
+        """
         self.state = state
         self.value = value
         self.parent = parent
         self.last_action = last_action
         self.total_visit_count = 1
         self.branches = {}
-        valid_actions_to_state_map = state.get_valid_actions_next_state_map()
-        for action in valid_actions_to_state_map:
-            p = priors[action]
-            next_state = valid_actions_to_state_map[action]
-            self.branches[action] = Branch(p, next_state)
         self.children = {}
+        self.proven_value = value if terminal else None
+        self.proven_depth = 0 if terminal else None
+        # Input of the model for the state, only kept for the nodes that can be the root of a search
+        self.encoded_state = None
+        if terminal:
+            return
+        # Next states are created the first time a branch is expanded
+        for action in state.get_valid_actions():
+            self.branches[action] = Branch(priors[action.action_id])
 
     def actions(self):
         return self.branches.keys()
 
+    def select_branch(self, c, excluded=()):
+        total_n = self.total_visit_count
+
+        def score_branch(action):
+            q = self.expected_value(action)
+            p = self.prior(action)
+            n = self.visit_count(action)
+            return q + c * p * np.sqrt(total_n) / (n + 1)
+
+        return max((action for action in self.actions() if action not in excluded), key=score_branch)
+
     def add_child(self, action, child_node):
         self.children[action] = child_node
 
+    def set_prior(self, action, prior):
+        self.branches[action].prior = prior
+
+    def set_proven(self, value, depth):
+        self.proven_value = value
+        self.proven_depth = depth
+
     def has_child(self, action):
         return action in self.children
 
@@ -50,6 +105,18 @@ class AlphaZeroTreeNode:
         self.branches[action].visit_count += 1
         self.branches[action].total_value += value
 
+    def add_virtual_loss(self, action, virtual_loss):
+        """Counts a visit to the branch that has not been evaluated yet as a loss, so other paths of the same batch
+        are discouraged from following it"""
+        self.total_visit_count += 1
+        self.branches[action].visit_count += 1
+        self.branches[action].total_value -= virtual_loss
+
+    def revert_virtual_loss(self, action, virtual_loss):
+        self.total_visit_count -= 1
+        self.branches[action].visit_count -= 1
+        self.branches[action].total_value += virtual_loss
+
     def expected_value(self, action):
         branch = self.branches[action]
         if branch.visit_count == 0:
@@ -60,7 +127,10 @@ class AlphaZeroTreeNode:
         return self.branches[action].prior
 
     def next_state(self, action):
-        return self.branches[action].next_state
+        branch = self.branches[action]
+        if branch.next_state is None:
+            branch.next_state = self.state.apply(action)
+        return branch.next_state
 
     def visit_count(self, action):
         if action in self.branches:
@@ -68,9 +138,147 @@ class AlphaZeroTreeNode:
         return 0
 
 
+class SearchStats:
+    """Statistics of the search run to select an action, or of several searches added up
+    Attributes:
+        searches             (int):   number of searches
+        rounds               (int):   number of simulations run
+        nodes_added          (int):   number of nodes added to the tree
+        time_sec             (float): duration of the search in seconds
+        stop_reason          (str):   what stopped the search: 'rounds', 'time', 'nodes', 'decided' or
+                                      'proven'
+        rounds_saved         (int):   number of simulations not run because the most visited action was decided
+        transpositions       (int):   number of branches linked to a node already in the tree instead of adding a new
+                                      one
+        proven_depth         (int):   number of actions of the win proven from the root, None if no win was proven
+        max_depth            (int):   number of actions from the root to the deepest leaf reached
+        evaluations          (int):   number of states evaluated by the model
+        cache_hits           (int):   number of states whose evaluation was found in the evaluation cache
+        selection_sec        (float): seconds spent descending the tree to the leaves, only measured when profiling
+        state_generation_sec (float): seconds spent creating the next states and their nodes, only measured when
+                                      profiling
+        encoding_sec         (float): seconds spent encoding states for the model, only measured when profiling
+        inference_sec        (float): seconds spent waiting for the model, only measured when profiling
+        backup_sec           (float): seconds spent propagating the values, only measured when profiling
+    """
+    __slots__ = ('searches', 'rounds', 'nodes_added', 'time_sec', 'stop_reason', 'rounds_saved', 'transpositions',
+                 'proven_depth', 'max_depth', 'evaluations', 'cache_hits', 'selection_sec', 'state_generation_sec',
+                 'encoding_sec', 'inference_sec', 'backup_sec')
+
+    def __init__(self):
+        self.searches = 0
+        self.rounds = 0
+        self.nodes_added = 0
+        self.time_sec = 0.0
+        self.stop_reason = None
+        self.rounds_saved = 0
+        self.transpositions = 0
+        self.proven_depth = None
+        self.max_depth = 0
+        self.evaluations = 0
+        self.cache_hits = 0
+        self.selection_sec = 0.0
+        self.state_generation_sec = 0.0
+        self.encoding_sec = 0.0
+        self.inference_sec = 0.0
+        self.backup_sec = 0.0
+
+    @property
+    def simulations_per_second(self):
+        return self.rounds / self.time_sec if self.time_sec > 0 else 0.0
+
+    @property
+    def profiled_sec(self):
+        return self.selection_sec + self.state_generation_sec + self.encoding_sec + self.inference_sec + \
+            self.backup_sec
+
+    def add(self, other):
+        """Adds the counters and times of another search, the stop reason and proven depth are not added
+        Args:
+            other (SearchStats): statistics to add
+        """
+        self.searches += other.searches
+        self.rounds += other.rounds
+        self.nodes_added += other.nodes_added
+        self.time_sec += other.time_sec
+        self.rounds_saved += other.rounds_saved
+        self.transpositions += other.transpositions
+        self.max_depth = max(self.max_depth, other.max_depth)
+        self.evaluations += other.evaluations
+        self.cache_hits += other.cache_hits
+        self.selection_sec += other.selection_sec
+        self.state_generation_sec += other.state_generation_sec
+        self.encoding_sec += other.encoding_sec
+        self.inference_sec += other.inference_sec
+        self.backup_sec += other.backup_sec
+
+    def to_dict(self):
+        stats = {name: getattr(self, name) for name in self.__slots__}
+        stats['simulations_per_second'] = self.simulations_per_second
+        return stats
+
+    def __str__(self):
+        description = f'{self.rounds} rounds, {self.nodes_added} nodes added in {self.time_sec:.3f} seconds ' \
+                      f'({self.simulations_per_second:.0f} simulations/s)'
+        if self.searches > 1:
+            description += f' over {self.searches} searches'
+        if self.stop_reason is not None:
+            description += f', stopped by {self.stop_reason}'
+        description += f', {self.rounds_saved} rounds saved, {self.transpositions} transpositions, ' \
+                       f'max depth {self.max_depth}, {self.evaluations} evaluations, {self.cache_hits} cache hits'
+        if self.profiled_sec > 0:
+            description += f', selection {self.selection_sec:.3f}s, state generation ' \
+                           f'{self.state_generation_sec:.3f}s, encoding {self.encoding_sec:.3f}s, inference ' \
+                           f'{self.inference_sec:.3f}s, backup {self.backup_sec:.3f}s'
+        return description
+
+
 class AlphaZeroAgent(Agent):
 
-    def __init__(self, model, encoder=None, rounds_per_action=1600, c=2.0, collector=None):
+    def __init__(self, model, encoder=None, rounds_per_action=1600, c=2.0, collector=None, leaf_batch_size=1,
+                 virtual_loss=1.0, reuse_tree=True, array_tree=False, tree_capacity=None,
+                 evaluation_cache=None, model_id=None, time_budget=None, node_budget=None, early_stop=False,
+                 transpositions=False, root_noise=0.0, dirichlet_alpha=0.3, seed=None, profile=False):
+        """Initializes the agent
+        Args:
+            model             (keras.Model):                  model predicting the priors and value of a state
+            encoder           (Encoder):                      encoder of the states for the model
+            rounds_per_action (int):                          max number of simulations before picking an action,
+                                                              None to only stop on the budgets
+            c                 (float):                        exploration constant
+            collector         (AlphaZeroExperienceCollector): collector of the decisions taken, optional
+            leaf_batch_size   (int):                          number of leaves selected before evaluating them all in
+                                                              a single model call
+            virtual_loss      (float):                        value subtracted from a branch while one of its leaves
+                                                              waits to be evaluated
+            reuse_tree        (bool):                         whether the subtree of the selected action is kept as
+                                                              root for the next state
+            array_tree        (bool):                         whether the nodes are stored in an AlphaZeroArrayTree
+                                                              instead of AlphaZeroTreeNode objects
+            tree_capacity     (int):                          number of nodes allocated by the array tree, by default
+                                                              one per round and the root
+            evaluation_cache  (EvaluationCache):              cache of the model evaluations, optional
+            model_id          (str):                          id of the model in the evaluation cache, it must be the
+                                                              same between runs to use a saved cache
+            time_budget       (float):                        max seconds spent searching an action, optional
+            node_budget       (int):                          max number of nodes added to the tree while searching
+                                                              an action, optional
+            early_stop        (bool):                         whether the search stops when the rounds left can't
+                                                              change the most visited action
+            transpositions    (bool):                         whether states reached by different sequences of
+                                                              actions share their node, turning the tree into a graph
+            root_noise        (float):                        weight of the dirichlet noise mixed into the priors of
+                                                              the root of every search, 0 to use the predicted priors
+            dirichlet_alpha   (float):                        concentration of the dirichlet noise
+            seed              (int):                          seed of the noise generator, optional
+            profile           (bool):                         whether the time spent in every phase of the search is
+                                                              measured, the counters are always kept
+        The budgets are only checked after the first batch of simulations, so a search runs one batch even with a
+        budget of 0 and may add nodes beyond node_budget. The only search without simulations is the one of a root
+        already proven, kept from the previous search. search_stats has the statistics of the last search.
+        """
+        assert_or_throw(rounds_per_action is not None or time_budget is not None or node_budget is not None,
+                        UnboundedSearchException())
         self.model = model
         self.encoder = encoder
 
@@ -78,69 +286,417 @@ class AlphaZeroAgent(Agent):
 
         self.num_rounds = rounds_per_action
         self.c = c
+        self.leaf_batch_size = max(1, leaf_batch_size)
+        self.virtual_loss = virtual_loss
+        self.reuse_tree = reuse_tree
+        self.array_tree = array_tree
+        self.time_budget = time_budget
+        self.node_budget = node_budget
+        self.early_stop = early_stop
+        self.transpositions = transpositions
+        self.root_noise = root_noise
+        self.dirichlet_alpha = dirichlet_alpha
+        self.__random = np.random.default_rng(seed)
+        self.profile = profile
+        self.__clock = time.perf_counter if profile else no_clock
+        if tree_capacity is None:
+            tree_capacity = min(n for n in (rounds_per_action, node_budget, 1023) if n is not None) + 1
+        self.tree_capacity = tree_capacity
+        self.evaluation_cache = evaluation_cache
+        self.model_id = model_id if model_id is not None else str(id(model))
+        self.search_stats = SearchStats()
+        self.__root = None
+        self.__tree = None
+        self.__root_encoded_state = None
+        # Nodes of the current search by transposition key, only used when transpositions is set
+        self.__nodes = {}
 
     def select_action(self, game_state):
-
-        root = self.__create_node(game_state)
-
-        for i in range(self.num_rounds):
-            node = root
-            next_action = self.__select_branch(node)
-            while node.has_child(next_action):
-                node = node.get_child(next_action)
-                next_action = self.__select_branch(node)
-
-            new_state = node.next_state(next_action)
-            child_node = self.__create_node(
-                new_state, action=next_action, parent=node)
-
-            action = next_action
-            value = child_node.value
-            while node is not None:
-                node.record_visit(action, value)
-                action = node.last_action
-                node = node.parent
-                # value = -1 * value
-
-        if self.collector is not None:
-            root_state_tensor = self.encoder.encode(game_state)
-            visit_counts = np.array([
-                root.visit_count(
-                    self.encoder.decode_action_index(idx))
-                for idx in range(self.encoder.num_actions())
-            ])
+        action, visit_counts = self.search(game_state)
+        if action is not None and self.collector is not None:
+            root_state_tensor = self.__root_encoded_state
+            if root_state_tensor is None:
+                root_state_tensor = self.encoder.encode(game_state)
             self.collector.record_decision(
                 root_state_tensor, visit_counts)
-
+        return action
+
+    def search(self, game_state):
+        """Runs the simulations from the state and picks an action, without recording the decision in the collector
+        Args:
+            game_state (GameState): state to pick an action for
+        Returns:
+            action       (Action):   action of the shortest proven win if any, otherwise the most visited action. None
+                                     if there are no valid actions
+            visit_counts (np array): visits of every action id, None if there are no valid actions
+        """
+        start = time.monotonic()
+        self.search_stats = stats = SearchStats()
+        stats.searches = 1
+
+        root = self.__get_root(game_state)
+        if not root.actions():
+            # The game is over or the robots can't move to a state not visited before
+            stats.time_sec = time.monotonic() - start
+            return None, None
+
+        while True:
+            batch_size = self.leaf_batch_size
+            if self.num_rounds is not None:
+                batch_size = min(batch_size, self.num_rounds - stats.rounds)
+            if self.node_budget is not None:
+                # Every simulation adds one node at most
+                batch_size = min(batch_size, self.node_budget - stats.nodes_added)
+            if root.proven_value is not None:
+                # One of the root actions is a proven win or all of them are proven, more rounds can't change the
+                # value of the root
+                stats.stop_reason = 'proven'
+                break
+            if stats.rounds > 0:
+                if self.num_rounds is not None and stats.rounds >= self.num_rounds:
+                    stats.stop_reason = 'rounds'
+                    break
+                if self.time_budget is not None and time.monotonic() - start >= self.time_budget:
+                    stats.stop_reason = 'time'
+                    break
+                if batch_size <= 0:
+                    stats.stop_reason = 'nodes'
+                    break
+                if self.early_stop and self.num_rounds is not None and \
+                        self.__is_decided(root, self.num_rounds - stats.rounds):
+                    stats.stop_reason = 'decided'
+                    stats.rounds_saved = self.num_rounds - stats.rounds
+                    break
+            batch_size = max(1, batch_size)
+            clock_start = self.__clock()
+            leaves = [self.__select_leaf(root) for _ in range(batch_size)]
+            stats.selection_sec += self.__clock() - clock_start
+            self.__expand_and_backup(leaves)
+            stats.rounds += batch_size
+        stats.time_sec = time.monotonic() - start
+        if root.proven_value is not None and root.proven_value >= WIN_VALUE:
+            stats.proven_depth = root.proven_depth
+
+        visit_counts = np.zeros(self.encoder.num_actions(), dtype=int)
+        for action in root.actions():
+            visit_counts[action.action_id] = root.visit_count(action)
+        self.__root_encoded_state = root.encoded_state
+        action = self.__best_action(root)
+        self.__keep_subtree(root, action)
+        return action, visit_counts
+
+    @staticmethod
+    def __is_decided(root, rounds_left):
+        """Checks if the most visited action of the root stays the most visited whatever the rounds left do"""
+        visit_counts = sorted((root.visit_count(action) for action in root.actions()), reverse=True)
+        if len(visit_counts) < 2:
+            return True
+        return visit_counts[0] - visit_counts[1] > rounds_left
+
+    @staticmethod
+    def __best_action(root):
+        """Gets the action of the shortest proven win if any, otherwise the most visited action"""
+        if root.proven_value is not None and root.proven_value >= WIN_VALUE:
+            wins = [action for action in root.actions() if root.has_child(action) and
+                    root.get_child(action).proven_value is not None and
+                    root.get_child(action).proven_value >= WIN_VALUE]
+            return min(wins, key=lambda action: root.get_child(action).proven_depth)
         return max(root.actions(), key=root.visit_count)
 
-    def __select_branch(self, node):
-        total_n = node.total_visit_count
-
-        def score_branch(action):
-            q = node.expected_value(action)
-            p = node.prior(action)
-            n = node.visit_count(action)
-            return q + self.c * p * np.sqrt(total_n) / (n + 1)
+    def __get_root(self, game_state):
+        """Gets the subtree kept from the previous action when it was built for the same state, otherwise a new root
+        is created. With transpositions the kept node may hold the state of another path, so it's only kept when it
+        has the same valid actions as the state"""
+        root = self.__root
+        self.__root = None
+        if root is None or root.state.game is not game_state.game or \
+                root.state.zobrist_hash is None or root.state.zobrist_hash != game_state.zobrist_hash or \
+                (self.transpositions and self.__get_node_key(root) != self.__get_state_key(game_state)):
+            self.__nodes = {}
+            if self.array_tree:
+                self.__tree = AlphaZeroArrayTree(self.encoder.num_actions(), self.tree_capacity)
+            root = self.__create_node(game_state)
+        if self.root_noise > 0:
+            self.__add_root_noise(root)
+        return root
+
+    def __add_root_noise(self, root):
+        """Mixes dirichlet noise into the priors of the root so searches with different seeds explore different
+        actions. A root kept from the previous action gets noise too, it was expanded as a child with the priors of
+        the model"""
+        actions = list(root.actions())
+        if not actions:
+            return
+        noise = self.__random.dirichlet([self.dirichlet_alpha] * len(actions))
+        for action, action_noise in zip(actions, noise):
+            root.set_prior(action, (1 - self.root_noise) * root.prior(action) + self.root_noise * action_noise)
+
+    def __keep_subtree(self, root, action):
+        if not self.reuse_tree or not root.has_child(action):
+            self.__nodes = {}
+            return
+        if self.array_tree:
+            self.__root = self.__tree.subtree(root.get_child(action).index)
+            self.__tree = self.__root.tree
+        else:
+            child = root.get_child(action)
+            child.parent = None
+            child.last_action = None
+            self.__root = child
+        if self.transpositions:
+            # Only the nodes reachable from the new root are kept
+            self.__nodes = {self.__get_node_key(node): node for node in self.__get_descendants(self.__root)}
+
+    @staticmethod
+    def __get_descendants(root):
+        """Gets the node and the nodes reachable from it, each one once even if it's reached by several paths"""
+        nodes = [root]
+        seen = {root}
+        for node in nodes:
+            for action in node.actions():
+                if node.has_child(action):
+                    child = node.get_child(action)
+                    if child not in seen:
+                        seen.add(child)
+                        nodes.append(child)
+        return nodes
+
+    def __select_leaf(self, root):
+        """Descends from the root to a branch without child node or whose child value is proven, adding virtual loss
+        to every branch in the path. With transpositions a node can be reached by several paths, so the path is kept
+        to back up the value through the branches followed, and the descent also stops at a branch that goes back to a
+        node already in the path
+        Returns:
+            path (list): node and action of every branch followed, the last one is the branch to expand or back up. The
+                         array tree walks the indices of its nodes and gives an AlphaZeroArrayTreePath
+        """
+        if self.array_tree:
+            return root.tree.select_leaf(root.index, self.c, self.virtual_loss, WIN_VALUE, self.transpositions)
+        node = root
+        next_action = self.__select_branch(node)
+        node.add_virtual_loss(next_action, self.virtual_loss)
+        path = [(node, next_action)]
+        in_path = {node} if self.transpositions else None
+        while node.has_child(next_action) and node.get_child(next_action).proven_value is None:
+            node = node.get_child(next_action)
+            if in_path is not None:
+                if node in in_path:
+                    break
+                in_path.add(node)
+            next_action = self.__select_branch(node)
+            node.add_virtual_loss(next_action, self.virtual_loss)
+            path.append((node, next_action))
+        return path
+
+    def __expand_and_backup(self, paths):
+        """Evaluates the states of the leaves in a single model call, adds their nodes to the tree and propagates
+        their values through the paths replacing the virtual loss. Paths of the same batch that ended in the same
+        leaf share its node, and so do leaves whose state is already in the tree when transpositions is set
+        """
+        stats = self.search_stats
+        clock_start = self.__clock()
+        # Leaves without child node and the number of actions from the root to their next state
+        pending = {}
+        for path in paths:
+            node, action = self.__get_leaf(path)
+            if not node.has_child(action):
+                pending.setdefault((node, action), len(path))
+        # Terminal states are scored by the game, only the others are evaluated by the model
+        evaluated = []
+        evaluated_keys = set()
+        transposed = []
+        for (node, action), depth in pending.items():
+            next_state = node.next_state(action)
+            key = self.__get_state_key(next_state) if self.transpositions else None
+            if key is not None and key in self.__nodes:
+                transposed.append((node, action, key))
+            elif self.__is_terminal(next_state):
+                self.__add_node(next_state, next_state.get_value(), None, action, node, terminal=True, key=key)
+            elif key is not None and key in evaluated_keys:
+                # Reached by another leaf of the batch, linked once that leaf node is added
+                transposed.append((node, action, key))
+            else:
+                evaluated.append((node, action, key, depth))
+                if key is not None:
+                    evaluated_keys.add(key)
+        stats.state_generation_sec += self.__clock() - clock_start
+        if evaluated:
+            next_states = [node.next_state(action) for node, action, _, _ in evaluated]
+            priors, values, encoded_states = self.__predict(next_states)
+            clock_start = self.__clock()
+            for i, (node, action, key, depth) in enumerate(evaluated):
+                child = self.__add_node(node.next_state(action), values[i][0], priors[i], action, node, key=key)
+                self.__keep_encoded_state(child, encoded_states[i], depth)
+            stats.state_generation_sec += self.__clock() - clock_start
+        for node, action, key in transposed:
+            node.add_child(action, self.__nodes[key])
+            stats.transpositions += 1
+
+        clock_start = self.__clock()
+        for path in paths:
+            stats.max_depth = max(stats.max_depth, len(path))
+            node, action = self.__get_leaf(path)
+            child = node.get_child(action)
+            proven = child.proven_value is not None
+            value = child.proven_value if proven else child.value
+            if not self.array_tree:
+                for node, action in reversed(path):
+                    node.revert_virtual_loss(action, self.virtual_loss)
+                    node.record_visit(action, value)
+                    if proven:
+                        proven = self.__update_proven(node)
+                    # value = -1 * value
+                continue
+            path.tree.backup(path, value, self.virtual_loss)
+            # Only the nodes of the path whose children are proven can become proven
+            if proven:
+                for node in path.reversed_nodes():
+                    if not self.__update_proven(node):
+                        break
+        stats.backup_sec += self.__clock() - clock_start
+
+    def __get_leaf(self, path):
+        """Gets the last node of a path and the action followed from it"""
+        return path.leaf() if self.array_tree else path[-1]
+
+    @staticmethod
+    def __is_terminal(game_state):
+        return game_state.game.is_over(game_state) or not game_state.get_valid_actions()
+
+    @staticmethod
+    def __get_state_key(game_state):
+        """Gets the transposition key of a state: its zobrist hash and the ids of its valid actions, which depend on the
+        states visited before because of the repetition rule. Nodes are only shared by states with the same valid
+        actions, terminal states have none.
+        A shared node keeps the state, and so the history, of the first path that reached it, and the next states of
+        its branches are created from that state. Deeper in the subtree the valid actions follow that history, so a
+        node reached by another path may offer an action that repeats a state of that path, or miss one whose state
+        was only visited on the first path. The values backed up through those nodes are approximations for the
+        other paths, the root always gets the valid actions of the state searched
+        Returns:
+            key (tuple): zobrist hash and valid actions mask, None if the state has no zobrist hash
+        """
+        if game_state.zobrist_hash is None:
+            return None
+        valid_actions = 0
+        if not game_state.game.is_over(game_state):
+            for action in game_state.get_valid_actions():
+                valid_actions |= 1 << action.action_id
+        return int(game_state.zobrist_hash), valid_actions
+
+    @staticmethod
+    def __get_node_key(node):
+        valid_actions = 0
+        for action in node.actions():
+            valid_actions |= 1 << action.action_id
+        return int(node.state.zobrist_hash), valid_actions
+
+    @staticmethod
+    def __update_proven(node):
+        """Marks the node as proven when one of its children is a proven win, or when all its children are proven.
+        Returns:
+            proven (bool): whether the node value is proven
+        """
+        if node.proven_value is not None:
+            return True
+        best = None
+        all_proven = True
+        for action in node.actions():
+            child = node.get_child(action) if node.has_child(action) else None
+            if child is None or child.proven_value is None:
+                all_proven = False
+                continue
+            if best is None or (child.proven_value, -child.proven_depth) > (best.proven_value, -best.proven_depth):
+                best = child
+        if best is None or (best.proven_value < WIN_VALUE and not all_proven):
+            return False
+        node.set_proven(best.proven_value, best.proven_depth + 1)
+        return True
 
-        return max(node.actions(), key=score_branch)
+    def __select_branch(self, node):
+        """Picks the branch with the highest score. Children proven not to win are skipped while some sibling isn't
+        proven, visiting them again can't change the value of the node"""
+        action = node.select_branch(self.c)
+        if not self.__is_proven_non_win(node, action):
+            return action
+        excluded = [action for action in node.actions() if self.__is_proven_non_win(node, action)]
+        if len(excluded) == len(node.actions()):
+            return action
+        return node.select_branch(self.c, excluded)
+
+    @staticmethod
+    def __is_proven_non_win(node, action):
+        if not node.has_child(action):
+            return False
+        proven_value = node.get_child(action).proven_value
+        return proven_value is not None and proven_value < WIN_VALUE
 
     def __create_node(self, game_state, action=None, parent=None):
-        state_tensor = self.encoder.encode(game_state)
-        model_input = np.array([state_tensor])
+        key = self.__get_state_key(game_state) if self.transpositions else None
+        if self.__is_terminal(game_state):
+            return self.__add_node(game_state, game_state.get_value(), None, action, parent, terminal=True, key=key)
+        priors, values, encoded_states = self.__predict([game_state])
+        node = self.__add_node(game_state, values[0][0], priors[0], action, parent, key=key)
+        self.__keep_encoded_state(node, encoded_states[0], 0)
+        return node
+
+    def __keep_encoded_state(self, node, encoded_state, depth):
+        """Keeps the model input of a node close to the root, it's only needed to record the decisions"""
+        if self.collector is not None and depth <= ENCODED_STATE_MAX_DEPTH:
+            node.encoded_state = encoded_state
+
+    def __predict(self, game_states):
+        """Gets the priors and values of the states, from the evaluation cache if possible
+        Returns:
+            priors         (np array): priors of every state
+            values         (np array): value of every state
+            encoded_states (list):     model input of every state, None for the states found in the cache
+        """
+        if self.evaluation_cache is None:
+            return self.__evaluate(game_states)
+
+        keys = [get_evaluation_key(self.model_id, game_state) for game_state in game_states]
+        evaluations = [self.evaluation_cache.get(key) if key is not None else None for key in keys]
+        missing = [i for i, evaluation in enumerate(evaluations) if evaluation is None]
+        self.search_stats.cache_hits += len(game_states) - len(missing)
+        encoded_states = [None] * len(game_states)
+        if missing:
+            priors, values, missing_encoded_states = self.__evaluate([game_states[i] for i in missing])
+            for j, i in enumerate(missing):
+                evaluations[i] = (priors[j], values[j][0])
+                encoded_states[i] = missing_encoded_states[j]
+                if keys[i] is not None:
+                    self.evaluation_cache.put(keys[i], priors[j], values[j][0])
+        priors = np.array([evaluation[0] for evaluation in evaluations])
+        values = np.array([[evaluation[1]] for evaluation in evaluations])
+        return priors, values, encoded_states
+
+    def __evaluate(self, game_states):
+        """Predicts the priors and values of the states in a single model call, the states are encoded once"""
+        stats = self.search_stats
+        clock_start = self.__clock()
+        encoded_states = [self.encoder.encode(game_state) for game_state in game_states]
+        model_input = np.array(encoded_states)
+        clock_encoded = self.__clock()
         priors, values = self.model.predict(model_input)
-        priors = priors[0]
-        value = values[0][0]
-        action_priors = {
-            self.encoder.decode_action_index(idx): p
-            for idx, p in enumerate(priors)
-        }
-        new_node = AlphaZeroTreeNode(
-            game_state, value,
-            action_priors,
-            parent, action)
-        if parent is not None:
-            parent.add_child(action, new_node)
+        stats.encoding_sec += clock_encoded - clock_start
+        stats.inference_sec += self.__clock() - clock_encoded
+        stats.evaluations += len(game_states)
+        return priors, values, encoded_states
+
+    def __add_node(self, game_state, value, priors, action, parent, terminal=False, key=None):
+        self.search_stats.nodes_added += 1
+        if self.array_tree:
+            new_node = self.__tree.add_node(game_state, value, priors, parent, action, terminal=terminal)
+        else:
+            new_node = AlphaZeroTreeNode(
+                game_state, value,
+                priors,
+                parent, action, terminal=terminal)
+            if parent is not None:
+                parent.add_child(action, new_node)
+        if key is not None:
+            self.__nodes[key] = new_node
         return new_node
 
     def train(self, experience, learning_rate, batch_size):
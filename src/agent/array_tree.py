@@ -0,0 +1,398 @@
+import numpy as np
+
+__all__ = [
+    'AlphaZeroArrayTree',
+    'AlphaZeroArrayTreeNode',
+    'AlphaZeroArrayTreePath',
+]
+
+NO_NODE = -1
+
+
+class AlphaZeroArrayTree:
+    """Pool of search tree nodes stored as numpy arrays over the action id space, row i holds the branches of node i.
+    The pool is allocated for the expected number of nodes and doubles its capacity when it gets full.
+    Attributes:
+        num_actions        (int):      number of action ids
+        priors             (np array): prior of every branch, 0 when the action is not valid
+        visit_counts       (np array): visits of every branch
+        total_values       (np array): sum of the values backed up through every branch
+        children           (np array): index of the node reached by every branch, NO_NODE if not expanded
+        valid              (np array): whether the action is valid in the node
+        total_visit_counts (np array): visits of every node
+        values             (np array): value predicted for every node
+        parents            (np array): index of the node that added every node, NO_NODE for the root
+        last_actions       (np array): id of the action that leads from the parent to the node
+        proven_values      (np array): value of the nodes whose value is known without searching, nan otherwise
+        proven_depths      (np array): number of actions to the terminal state that proves the node value
+        size               (int):      number of nodes in the pool
+    """
+
+    def __init__(self, num_actions, capacity=1024):
+        """Initializes an empty pool
+        Args:
+            num_actions (int): number of action ids
+            capacity    (int): number of nodes allocated
+        """
+        capacity = max(1, capacity)
+        self.num_actions = num_actions
+        self.priors = np.zeros((capacity, num_actions), dtype=np.float32)
+        self.visit_counts = np.zeros((capacity, num_actions), dtype=np.int32)
+        self.total_values = np.zeros((capacity, num_actions), dtype=np.float64)
+        self.children = np.full((capacity, num_actions), NO_NODE, dtype=np.int32)
+        self.valid = np.zeros((capacity, num_actions), dtype=bool)
+        self.total_visit_counts = np.zeros(capacity, dtype=np.int32)
+        self.values = np.zeros(capacity, dtype=np.float64)
+        self.parents = np.full(capacity, NO_NODE, dtype=np.int32)
+        self.last_actions = np.full(capacity, NO_NODE, dtype=np.int32)
+        self.proven_values = np.full(capacity, np.nan)
+        self.proven_depths = np.zeros(capacity, dtype=np.int32)
+        self.size = 0
+        self.__states = []
+        self.__valid_actions = []
+        self.__next_states = []
+        self.__encoded_states = []
+        self.__actions = {}
+
+    @property
+    def capacity(self):
+        return self.values.shape[0]
+
+    def add_node(self, state, value, priors, parent=None, last_action=None, terminal=False):
+        """Adds a node for a state, its branches are the valid actions of the state
+        Args:
+            state       (GameState):              state of the node
+            value       (float):                  value predicted for the state, or given by the game if terminal
+            priors      (np array):               prior predicted for every action id, not used if terminal
+            parent      (AlphaZeroArrayTreeNode): parent of the node, None for the root
+            last_action (Action):                 action that leads from the parent to the node
+            terminal    (bool):                   whether the game is over or there are no valid actions, the node has
+                                                  no branches and its value is proven
+        Returns:
+            node (AlphaZeroArrayTreeNode): node added
+        """
+        if self.size == self.capacity:
+            self.__grow()
+        i = self.size
+        self.size += 1
+        valid_actions = state.get_valid_actions() if not terminal else []
+        action_ids = [action.action_id for action in valid_actions]
+        for action in valid_actions:
+            self.__actions[action.action_id] = action
+        if action_ids:
+            self.valid[i, action_ids] = True
+            self.priors[i, action_ids] = np.asarray(priors)[action_ids]
+        if terminal:
+            self.proven_values[i] = value
+        self.total_visit_counts[i] = 1
+        self.values[i] = value
+        self.__states.append(state)
+        self.__valid_actions.append(valid_actions)
+        self.__next_states.append(None)
+        self.__encoded_states.append(None)
+        if parent is not None:
+            self.parents[i] = parent.index
+            self.last_actions[i] = last_action.action_id
+            self.children[parent.index, last_action.action_id] = i
+        return AlphaZeroArrayTreeNode(self, i)
+
+    def node(self, i):
+        return AlphaZeroArrayTreeNode(self, i)
+
+    def state(self, i):
+        return self.__states[i]
+
+    def next_state(self, i, action):
+        """Gets the state after applying the action on the node state, it's created the first time it's needed"""
+        next_states = self.__next_states[i]
+        if next_states is None:
+            next_states = self.__next_states[i] = {}
+        next_state = next_states.get(action)
+        if next_state is None:
+            next_state = next_states[action] = self.__states[i].apply(action)
+        return next_state
+
+    def actions(self, i):
+        return self.__valid_actions[i]
+
+    def encoded_state(self, i):
+        return self.__encoded_states[i]
+
+    def set_encoded_state(self, i, encoded_state):
+        self.__encoded_states[i] = encoded_state
+
+    def action(self, action_id):
+        return self.__actions[action_id]
+
+    def select_branch(self, i, c, excluded=()):
+        """Gets the action with the highest upper confidence bound score of a node
+        Args:
+            i        (int):   index of the node
+            c        (float): exploration constant
+            excluded (list):  actions that can't be selected
+        Returns:
+            action (Action): action selected
+        """
+        scores = self.__scores(i, c)
+        for action in excluded:
+            scores[action.action_id] = -np.inf
+        return self.__actions[int(np.argmax(scores))]
+
+    def select_leaf(self, i, c, virtual_loss, win_value, stop_at_repeated=False):
+        """Descends from a node following the branches with the highest score until a branch without child node or
+        whose child value is proven, and adds virtual loss to the branches followed in a single update. Children
+        proven not to win are skipped while some sibling isn't proven
+        Args:
+            i                (int):   index of the node the descent starts from
+            c                (float): exploration constant
+            virtual_loss     (float): value subtracted from every branch followed until the leaf is backed up
+            win_value        (float): lowest value of a win
+            stop_at_repeated (bool):  whether the descent also stops at a branch that goes back to a node already in
+                                      the path, nodes can be reached by several paths with transpositions
+        Returns:
+            path (AlphaZeroArrayTreePath): branches followed, the last one is the branch to expand or back up
+        """
+        nodes = []
+        action_ids = []
+        in_path = set() if stop_at_repeated else None
+        while True:
+            action_id = self.__select_branch_id(i, c, win_value)
+            nodes.append(i)
+            action_ids.append(action_id)
+            child = self.children[i, action_id].item()
+            if child == NO_NODE or not np.isnan(self.proven_values[child]):
+                break
+            if in_path is not None:
+                in_path.add(i)
+                if child in in_path:
+                    break
+            i = child
+        path = AlphaZeroArrayTreePath(self, np.array(nodes), np.array(action_ids))
+        # Every node is once in the path, so all the branches can be updated at once
+        self.total_visit_counts[path.nodes] += 1
+        self.visit_counts[path.nodes, path.action_ids] += 1
+        self.total_values[path.nodes, path.action_ids] -= virtual_loss
+        return path
+
+    def backup(self, path, value, virtual_loss):
+        """Replaces the virtual loss of every branch of the path with the value in a single update, the visit counted
+        by the virtual loss is kept as the visit of the value
+        Args:
+            path         (AlphaZeroArrayTreePath): branches followed by the simulation
+            value        (float):                  value of the leaf
+            virtual_loss (float):                  virtual loss added when the path was selected
+        """
+        self.total_values[path.nodes, path.action_ids] += virtual_loss
+        self.total_values[path.nodes, path.action_ids] += value
+
+    def __scores(self, i, c):
+        visit_counts = self.visit_counts[i]
+        expected_values = np.divide(self.total_values[i], visit_counts, out=np.zeros(self.num_actions),
+                                    where=visit_counts > 0)
+        scores = expected_values + c * self.priors[i] * np.sqrt(self.total_visit_counts[i]) / (visit_counts + 1)
+        scores[~self.valid[i]] = -np.inf
+        return scores
+
+    def __select_branch_id(self, i, c, win_value):
+        scores = self.__scores(i, c)
+        action_id = int(np.argmax(scores))
+        child = self.children[i, action_id]
+        if child == NO_NODE or not self.proven_values[child] < win_value:
+            return action_id
+        # Visiting a child proven not to win again can't change the value of the node
+        children = self.children[i]
+        expanded = children != NO_NODE
+        open_branches = self.valid[i].copy()
+        open_branches[expanded] &= ~(self.proven_values[children[expanded]] < win_value)
+        if not open_branches.any():
+            return action_id
+        scores[~open_branches] = -np.inf
+        return int(np.argmax(scores))
+
+    def subtree(self, i):
+        """Creates a pool with the node and its descendants only, the node is the root of the new pool
+        Args:
+            i (int): index of the node
+        Returns:
+            root (AlphaZeroArrayTreeNode): node in the new pool
+        """
+        order = [i]
+        seen = {i}
+        for j in order:
+            row = self.children[j]
+            # A node shared by several parents is copied once
+            for k in row[row != NO_NODE].tolist():
+                if k not in seen:
+                    seen.add(k)
+                    order.append(k)
+        remap = np.full(self.size + 1, NO_NODE, dtype=np.int32)
+        remap[order] = np.arange(len(order), dtype=np.int32)
+        tree = AlphaZeroArrayTree(self.num_actions, self.capacity)
+        n = len(order)
+        tree.priors[:n] = self.priors[order]
+        tree.visit_counts[:n] = self.visit_counts[order]
+        tree.total_values[:n] = self.total_values[order]
+        tree.children[:n] = remap[self.children[order]]
+        tree.valid[:n] = self.valid[order]
+        tree.total_visit_counts[:n] = self.total_visit_counts[order]
+        tree.values[:n] = self.values[order]
+        tree.parents[:n] = remap[self.parents[order]]
+        tree.last_actions[:n] = self.last_actions[order]
+        tree.proven_values[:n] = self.proven_values[order]
+        tree.proven_depths[:n] = self.proven_depths[order]
+        tree.parents[0] = NO_NODE
+        tree.last_actions[0] = NO_NODE
+        tree.size = n
+        tree.__states = [self.__states[j] for j in order]
+        tree.__valid_actions = [self.__valid_actions[j] for j in order]
+        tree.__next_states = [self.__next_states[j] for j in order]
+        tree.__encoded_states = [self.__encoded_states[j] for j in order]
+        tree.__actions = self.__actions
+        return AlphaZeroArrayTreeNode(tree, 0)
+
+    def __grow(self):
+        capacity = self.capacity
+        self.priors = np.concatenate([self.priors, np.zeros_like(self.priors)])
+        self.visit_counts = np.concatenate([self.visit_counts, np.zeros_like(self.visit_counts)])
+        self.total_values = np.concatenate([self.total_values, np.zeros_like(self.total_values)])
+        self.children = np.concatenate([self.children, np.full_like(self.children, NO_NODE)])
+        self.valid = np.concatenate([self.valid, np.zeros_like(self.valid)])
+        self.total_visit_counts = np.concatenate([self.total_visit_counts, np.zeros(capacity, dtype=np.int32)])
+        self.values = np.concatenate([self.values, np.zeros(capacity)])
+        self.parents = np.concatenate([self.parents, np.full(capacity, NO_NODE, dtype=np.int32)])
+        self.last_actions = np.concatenate([self.last_actions, np.full(capacity, NO_NODE, dtype=np.int32)])
+        self.proven_values = np.concatenate([self.proven_values, np.full(capacity, np.nan)])
+        self.proven_depths = np.concatenate([self.proven_depths, np.zeros(capacity, dtype=np.int32)])
+
+
+class AlphaZeroArrayTreeNode:
+    """View of a node of an AlphaZeroArrayTree with the same interface as AlphaZeroTreeNode"""
+    __slots__ = ('tree', 'index')
+
+    def __init__(self, tree: AlphaZeroArrayTree, index):
+        self.tree = tree
+        self.index = index
+
+    def __eq__(self, other):
+        return isinstance(other, AlphaZeroArrayTreeNode) and self.tree is other.tree and self.index == other.index
+
+    def __hash__(self):
+        return self.index
+
+    @property
+    def state(self):
+        return self.tree.state(self.index)
+
+    @property
+    def value(self):
+        return self.tree.values[self.index]
+
+    @property
+    def encoded_state(self):
+        return self.tree.encoded_state(self.index)
+
+    @encoded_state.setter
+    def encoded_state(self, encoded_state):
+        self.tree.set_encoded_state(self.index, encoded_state)
+
+    @property
+    def parent(self):
+        parent = self.tree.parents[self.index]
+        return None if parent == NO_NODE else AlphaZeroArrayTreeNode(self.tree, int(parent))
+
+    @property
+    def last_action(self):
+        action_id = self.tree.last_actions[self.index]
+        return None if action_id == NO_NODE else self.tree.action(int(action_id))
+
+    @property
+    def total_visit_count(self):
+        return int(self.tree.total_visit_counts[self.index])
+
+    @property
+    def proven_value(self):
+        value = self.tree.proven_values[self.index]
+        return None if np.isnan(value) else value
+
+    @property
+    def proven_depth(self):
+        return None if self.proven_value is None else int(self.tree.proven_depths[self.index])
+
+    def set_proven(self, value, depth):
+        self.tree.proven_values[self.index] = value
+        self.tree.proven_depths[self.index] = depth
+
+    def actions(self):
+        return self.tree.actions(self.index)
+
+    def select_branch(self, c, excluded=()):
+        return self.tree.select_branch(self.index, c, excluded)
+
+    def has_child(self, action):
+        return self.tree.children[self.index, action.action_id] != NO_NODE
+
+    def get_child(self, action):
+        return AlphaZeroArrayTreeNode(self.tree, int(self.tree.children[self.index, action.action_id]))
+
+    def add_child(self, action, child_node):
+        self.tree.children[self.index, action.action_id] = child_node.index
+
+    def set_prior(self, action, prior):
+        self.tree.priors[self.index, action.action_id] = prior
+
+    def record_visit(self, action, value):
+        self.tree.total_visit_counts[self.index] += 1
+        self.tree.visit_counts[self.index, action.action_id] += 1
+        self.tree.total_values[self.index, action.action_id] += value
+
+    def add_virtual_loss(self, action, virtual_loss):
+        self.tree.total_visit_counts[self.index] += 1
+        self.tree.visit_counts[self.index, action.action_id] += 1
+        self.tree.total_values[self.index, action.action_id] -= virtual_loss
+
+    def revert_virtual_loss(self, action, virtual_loss):
+        self.tree.total_visit_counts[self.index] -= 1
+        self.tree.visit_counts[self.index, action.action_id] -= 1
+        self.tree.total_values[self.index, action.action_id] += virtual_loss
+
+    def expected_value(self, action):
+        visit_count = self.tree.visit_counts[self.index, action.action_id]
+        if visit_count == 0:
+            return 0.0
+        return self.tree.total_values[self.index, action.action_id] / visit_count
+
+    def prior(self, action):
+        return self.tree.priors[self.index, action.action_id]
+
+    def next_state(self, action):
+        return self.tree.next_state(self.index, action)
+
+    def visit_count(self, action):
+        return int(self.tree.visit_counts[self.index, action.action_id])
+
+
+class AlphaZeroArrayTreePath:
+    """Branches followed by a simulation from the root of an AlphaZeroArrayTree, as the index of every node and the id
+    of the action followed from it
+    Attributes:
+        tree       (AlphaZeroArrayTree): tree of the nodes
+        nodes      (np array):           index of every node of the path, from the root
+        action_ids (np array):           id of the action followed from every node
+    """
+    __slots__ = ('tree', 'nodes', 'action_ids')
+
+    def __init__(self, tree: AlphaZeroArrayTree, nodes, action_ids):
+        self.tree = tree
+        self.nodes = nodes
+        self.action_ids = action_ids
+
+    def __len__(self):
+        return len(self.nodes)
+
+    def leaf(self):
+        """Gets the last node of the path and the action followed from it"""
+        return AlphaZeroArrayTreeNode(self.tree, int(self.nodes[-1])), self.tree.action(int(self.action_ids[-1]))
+
+    def reversed_nodes(self):
+        """Gets the nodes of the path from the leaf to the root"""
+        return [AlphaZeroArrayTreeNode(self.tree, i) for i in reversed(self.nodes.tolist())]
@@ -0,0 +1,131 @@
+import os
+import pickle
+from collections import OrderedDict
+from threading import Lock
+
+import numpy as np
+
+__all__ = [
+    'EvaluationCache',
+    'get_evaluation_key',
+]
+
+DEFAULT_MAX_SIZE = 100000
+
+
+def get_evaluation_key(model_id, game_state):
+    """Gets the key of the model evaluation of a state. Besides the robots positions, the valid actions are part of the
+    key because the encoded state depends on them and they change with the states visited before
+    Args:
+        model_id   (str):              id of the model evaluating the state
+        game_state (RobotRebootState): state to evaluate
+    Returns:
+        key (tuple): (model id, maze id, goal robot, goal house, zobrist hash, valid actions mask), None if the state
+                     has no zobrist hash
+    """
+    if game_state.zobrist_hash is None:
+        return None
+    game = game_state.game
+    valid_actions = 0
+    for action in game_state.get_valid_actions():
+        valid_actions |= 1 << action.action_id
+    x, y = game.goal_house.house
+    return model_id, game.maze_id, game.goal_house.robot_id, (int(x), int(y)), int(game_state.zobrist_hash), \
+        valid_actions
+
+
+class EvaluationCache:
+    """Least recently used cache of the priors and value predicted by a model for a state. It can be shared by agents
+    in the same process and saved to disk to be used by later runs of the same model.
+    Attributes:
+        max_size (int): max number of evaluations kept
+        hits     (int): number of lookups that found the evaluation
+        misses   (int): number of lookups that didn't find the evaluation
+    """
+
+    def __init__(self, max_size=DEFAULT_MAX_SIZE):
+        self.__max_size = max_size
+        self.__entries = OrderedDict()
+        self.__lock = Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def max_size(self):
+        return self.__max_size
+
+    @property
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def __len__(self):
+        return len(self.__entries)
+
+    def __contains__(self, key):
+        return key in self.__entries
+
+    def get(self, key):
+        """Gets an evaluation and marks it as the most recently used
+        Args:
+            key (tuple): key of the evaluation
+        Returns:
+            evaluation (tuple): priors and value, None if not cached
+        """
+        with self.__lock:
+            evaluation = self.__entries.get(key)
+            if evaluation is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.__entries.move_to_end(key)
+            return evaluation
+
+    def put(self, key, priors, value):
+        """Stores an evaluation, the least recently used one is dropped when the cache is full
+        Args:
+            key    (tuple):    key of the evaluation
+            priors (np array): priors predicted for every action
+            value  (float):    value predicted
+        """
+        if self.__max_size <= 0:
+            return
+        with self.__lock:
+            self.__entries[key] = (np.array(priors, dtype=np.float32), float(value))
+            self.__entries.move_to_end(key)
+            while len(self.__entries) > self.__max_size:
+                self.__entries.popitem(last=False)
+
+    def clear(self):
+        with self.__lock:
+            self.__entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def save(self, path):
+        """Saves the evaluations to a file
+        Args:
+            path (str): file path
+        """
+        with self.__lock:
+            entries = list(self.__entries.items())
+        with open(path, 'wb') as f:
+            pickle.dump(entries, f)
+
+    def load(self, path):
+        """Adds the evaluations saved in a file, nothing is loaded when the file doesn't exist
+        Args:
+            path (str): file path
+        Returns:
+            count (int): number of evaluations loaded
+        """
+        if not os.path.isfile(path):
+            return 0
+        with open(path, 'rb') as f:
+            entries = pickle.load(f)
+        for key, (priors, value) in entries:
+            self.put(key, priors, value)
+        return len(entries)
+
+    def __str__(self):
+        return f'{len(self)} evaluations, {self.hits} hits, {self.misses} misses, hit rate {self.hit_rate:.2%}'
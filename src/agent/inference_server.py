@@ -0,0 +1,135 @@
+import logging
+import queue
+import threading
+import time
+
+import numpy as np
+
+__all__ = [
+    'InferenceServer',
+]
+
+DEFAULT_MAX_BATCH_SIZE = 64
+DEFAULT_MAX_WAIT_SECONDS = 0.005
+
+
+class InferenceRequest:
+    __slots__ = ('model_input', 'outputs', 'error', 'done')
+
+    def __init__(self, model_input):
+        self.model_input = model_input
+        self.outputs = None
+        self.error = None
+        self.done = threading.Event()
+
+
+class InferenceServer:
+    """Evaluates the model inputs submitted by several threads in a single model call. A background thread gathers the
+    requests until they add up to max_batch_size samples or the first one has waited max_wait_seconds. It has the same
+    predict interface as the model so it can be given to an agent instead of the model.
+    Attributes:
+        model            (keras.Model): model predicting the priors and value of the states
+        max_batch_size   (int):         max number of samples evaluated in one model call
+        max_wait_seconds (float):       max time a request waits for other requests to join its batch
+        batches          (int):         number of model calls
+        requests         (int):         number of predict calls served
+        samples          (int):         number of samples evaluated
+    """
+
+    def __init__(self, model, max_batch_size=DEFAULT_MAX_BATCH_SIZE, max_wait_seconds=DEFAULT_MAX_WAIT_SECONDS):
+        self.model = model
+        self.max_batch_size = max_batch_size
+        self.max_wait_seconds = max_wait_seconds
+        self.batches = 0
+        self.requests = 0
+        self.samples = 0
+        self.__queue = queue.Queue()
+        self.__thread = None
+
+    @property
+    def running(self):
+        return self.__thread is not None
+
+    @property
+    def mean_batch_size(self):
+        return self.samples / self.batches if self.batches else 0.0
+
+    def start(self):
+        if self.__thread is None:
+            self.__thread = threading.Thread(target=self.__serve, name='inference-server', daemon=True)
+            self.__thread.start()
+
+    def stop(self):
+        if self.__thread is not None:
+            self.__queue.put(None)
+            self.__thread.join()
+            self.__thread = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    def predict(self, model_input):
+        """Evaluates the model input with the inputs of other threads, blocking until the result is ready
+        Args:
+            model_input (np array): batch of encoded states
+        Returns:
+            outputs (list): model outputs for the input, priors and values
+        """
+        if self.__thread is None:
+            return self.model.predict(model_input)
+        request = InferenceRequest(model_input)
+        self.__queue.put(request)
+        request.done.wait()
+        if request.error is not None:
+            raise request.error
+        return request.outputs
+
+    def __serve(self):
+        stopping = False
+        while not stopping:
+            request = self.__queue.get()
+            if request is None:
+                break
+            batch = [request]
+            size = len(request.model_input)
+            deadline = time.monotonic() + self.max_wait_seconds
+            while size < self.max_batch_size:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    request = self.__queue.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                if request is None:
+                    stopping = True
+                    break
+                batch.append(request)
+                size += len(request.model_input)
+            self.__evaluate(batch)
+
+    def __evaluate(self, batch):
+        try:
+            outputs = self.model.predict(np.concatenate([request.model_input for request in batch]))
+        except Exception as e:
+            logging.exception('Inference failed')
+            for request in batch:
+                request.error = e
+                request.done.set()
+            return
+        self.batches += 1
+        self.requests += len(batch)
+        start = 0
+        for request in batch:
+            end = start + len(request.model_input)
+            request.outputs = [output[start:end] for output in outputs]
+            start = end
+            self.samples += len(request.model_input)
+            request.done.set()
+
+    def __str__(self):
+        return f'{self.requests} requests in {self.batches} batches, mean batch size {self.mean_batch_size:.1f}'
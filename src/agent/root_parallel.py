@@ -0,0 +1,141 @@
+import multiprocessing
+import time
+from collections import Counter
+
+import numpy as np
+from tensorflow import keras
+
+from src.agent.alphazero import AlphaZeroAgent, SearchStats
+from src.agent.base import Agent
+
+__all__ = [
+    'RootParallelAlphaZeroAgent',
+]
+
+DEFAULT_ROOT_NOISE = 0.25
+
+# Model of the worker process, loaded once when the worker starts
+_worker_model = None
+
+
+def init_search_worker(path_to_model):
+    global _worker_model
+    _worker_model = keras.models.load_model(path_to_model)
+
+
+def search_in_worker(encoder, game_state, seed, agent_settings):
+    """Runs an independent search of the state with the model of the worker
+    Returns:
+        action_id    (int):         id of the action picked by the search, None if there are no valid actions
+        visit_counts (np array):    visits of every action id, None if there are no valid actions
+        search_stats (SearchStats): statistics of the search
+    """
+    agent = AlphaZeroAgent(_worker_model, encoder, seed=seed, **agent_settings)
+    action, visit_counts = agent.search(game_state)
+    return None if action is None else action.action_id, visit_counts, agent.search_stats
+
+
+class RootParallelAlphaZeroAgent(Agent):
+    """Searches the same state in several worker processes and merges the visits of the root actions. Every worker has
+    its own copy of the model and its searches mix dirichlet noise with their own seed into the root priors, so each
+    one explores different actions. The picked action is the shortest win proven by any worker, otherwise the action
+    with the most visits among all the workers.
+    The workers are started the first time an action is selected, stop must be called when the agent isn't needed
+    anymore, or the agent can be used as a context manager.
+    Attributes:
+        path_to_model  (str):                          path of the saved model loaded by every worker
+        encoder        (Encoder):                      encoder of the states for the model
+        workers        (int):                          number of processes searching every state
+        collector      (AlphaZeroExperienceCollector): collector of the decisions taken with the merged visits,
+                                                       optional
+        agent_settings (dict):                         arguments of the AlphaZeroAgent of every worker
+        search_stats   (SearchStats):                  statistics of the last search added up over the workers,
+                                                       time_sec is the time the merged search took
+    """
+
+    def __init__(self, path_to_model, encoder, workers=2, collector=None, seed=None, root_noise=DEFAULT_ROOT_NOISE,
+                 **agent_settings):
+        """Initializes the agent
+        Args:
+            path_to_model  (str):                          path of the saved model loaded by every worker
+            encoder        (Encoder):                      encoder of the states for the model
+            workers        (int):                          number of processes searching every state
+            collector      (AlphaZeroExperienceCollector): collector of the decisions taken, optional
+            seed           (int):                          seed of the worker seeds, optional
+            root_noise     (float):                        weight of the dirichlet noise mixed into the root priors of
+                                                           every worker
+            agent_settings (dict):                         other arguments of AlphaZeroAgent, the tree isn't reused
+                                                           and the evaluation cache isn't shared between processes
+        """
+        super().__init__()
+        self.path_to_model = path_to_model
+        self.encoder = encoder
+        self.workers = max(1, workers)
+        self.collector = collector
+        self.agent_settings = dict(agent_settings, root_noise=root_noise, reuse_tree=False, collector=None,
+                                   evaluation_cache=None)
+        self.search_stats = SearchStats()
+        self.__seeds = np.random.SeedSequence(seed)
+        self.__pool = None
+
+    @property
+    def running(self):
+        return self.__pool is not None
+
+    def start(self):
+        if self.__pool is None:
+            context = multiprocessing.get_context('spawn')
+            self.__pool = context.Pool(self.workers, initializer=init_search_worker,
+                                       initargs=(self.path_to_model,))
+
+    def stop(self):
+        if self.__pool is not None:
+            self.__pool.close()
+            self.__pool.join()
+            self.__pool = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    def select_action(self, game_state):
+        start = time.monotonic()
+        self.start()
+        seeds = [int(seed.generate_state(1)[0]) for seed in self.__seeds.spawn(self.workers)]
+        results = self.__pool.starmap(search_in_worker, [(self.encoder, game_state, seed, self.agent_settings)
+                                                         for seed in seeds])
+        results = [result for result in results if result[0] is not None]
+        self.search_stats = self.__merge_stats([search_stats for _, _, search_stats in results])
+        self.search_stats.time_sec = time.monotonic() - start
+        if not results:
+            return None
+
+        visit_counts = np.sum([worker_visit_counts for _, worker_visit_counts, _ in results], axis=0)
+        wins = [(search_stats.proven_depth, action_id) for action_id, _, search_stats in results
+                if search_stats.proven_depth is not None]
+        action_id = min(wins)[1] if wins else None
+        actions = {action.action_id: action for action in game_state.get_valid_actions()}
+        if action_id is None:
+            action_id = max(actions, key=lambda valid_action_id: visit_counts[valid_action_id])
+
+        if self.collector is not None:
+            root_state_tensor = self.encoder.encode(game_state)
+            self.collector.record_decision(
+                root_state_tensor, visit_counts)
+        return actions[action_id]
+
+    @staticmethod
+    def __merge_stats(worker_stats):
+        stats = SearchStats()
+        for search_stats in worker_stats:
+            stats.add(search_stats)
+            if search_stats.proven_depth is not None and \
+                    (stats.proven_depth is None or search_stats.proven_depth < stats.proven_depth):
+                stats.proven_depth = search_stats.proven_depth
+        if worker_stats:
+            stop_reasons = Counter(search_stats.stop_reason for search_stats in worker_stats)
+            stats.stop_reason = stop_reasons.most_common(1)[0][0]
+        return stats
@@ -1,6 +1,5 @@
 import numpy as np
 
-from src.encoders.action_encoder import get_map_actions_to_index_and_actions_list
 from src.encoders.base import Encoder
 from src.robot_reboot.state import RobotRebootState
 
@@ -22,27 +21,33 @@ class MazeAndRobotPositioningEncoder(Encoder):
     def __init__(self, game):
         self.__n_robots = game.robots_count
         self.__maze_size_rows, self.__maze_size_cols = game.maze_shape
-        self.__map_actions_to_index, self.__actions_list = get_map_actions_to_index_and_actions_list(game)
+        self.__actions_list = game.actions
 
     def name(self):
         return POSITIONING_ENCODER_NAME
 
-    def encode(self, game_state):
+    def encode(self, game_state, destinations=None):
+        """Encodes a game state
+        Args:
+            game_state   (RobotRebootState): state to encode
+            destinations (dict):             valid actions and where the robot moved by each one stops, when they are
+                                             already known. They are taken from the state otherwise
+        Returns:
+            encoded_state (np array): planes of the state
+        """
         game = game_state.game
         encoded_state = np.zeros(self.shape())
         encoded_state[:, :, 0] = game_state.game.maze
         self.__encode_robot_positions(encoded_state, game_state)
         self.__encode_goal_house(encoded_state, game)
-        self.__encode_robot_future_positions(encoded_state, game_state)
+        if destinations is None:
+            destinations = game.get_valid_actions_destinations_map(game_state)
+        self.__encode_robot_future_positions(encoded_state, destinations)
 
         return encoded_state
 
-    def __encode_robot_future_positions(self, encoded_state, game_state):
-        valid_actions = game_state.get_valid_actions_next_state_map()
-        for action in valid_actions:
-            next_state = valid_actions[action]
-            next_robot_positions = next_state.robots_positions
-            next_x, next_y = next_robot_positions[action.robot_id]
+    def __encode_robot_future_positions(self, encoded_state, destinations):
+        for action, (next_x, next_y) in destinations.items():
             robot_next_positions_layer = (action.robot_id * 3) + 3
             encoded_state[next_x, next_y, robot_next_positions_layer] = RobotRebootState.ROBOT_IN_CELL
 
@@ -57,7 +62,7 @@ class MazeAndRobotPositioningEncoder(Encoder):
             i += 3
 
     def encode_action(self, action):
-        return self.__map_actions_to_index[action]
+        return action.action_id
 
     def decode_action_index(self, index):
         return self.__actions_list[index]
@@ -1,6 +1,5 @@
 import numpy as np
 
-from src.encoders.action_encoder import get_map_actions_to_index_and_actions_list
 from src.encoders.base import Encoder
 from src.robot_reboot.state import RobotRebootState
 
@@ -19,7 +18,7 @@ class MazeAndTwoPlanesPerRobotEncoder(Encoder):
     def __init__(self, game):
         self.__n_robots = game.robots_count
         self.__maze_size_rows, self.__maze_size_cols = game.maze_shape
-        self.__map_actions_to_index, self.__actions_list = get_map_actions_to_index_and_actions_list(game)
+        self.__actions_list = game.actions
 
     def name(self):
         return MAZE_AND_TWO_PLANES_PER_ROBOT_ENCODER_NAME
@@ -38,7 +37,7 @@ class MazeAndTwoPlanesPerRobotEncoder(Encoder):
         return maze_matrix
 
     def encode_action(self, action):
-        return self.__map_actions_to_index[action]
+        return action.action_id
 
     def decode_action_index(self, index):
         return self.__actions_list[index]
@@ -0,0 +1,3 @@
+class UnboundedSearchException(Exception):
+    def __init__(self):
+        self.message = "The search needs a number of rounds, a time budget or a node budget"
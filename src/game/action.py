@@ -2,4 +2,4 @@ from abc import ABC
 
 
 class Action(ABC):
-    pass
+    __slots__ = ()
@@ -74,3 +74,13 @@ class Game(ABC):
                                  given state
         """
         pass
+
+    def get_valid_actions(self, state: State):
+        """Finds the actions that would produce a change if applied, without creating the next states when the game
+        can avoid it.
+        Args:
+            state (State): state to check which actions will produce a different state
+        Returns:
+            valid_actions (list): valid actions to perform on the given state
+        """
+        return list(self.get_valid_actions_next_state_map(state).keys())
@@ -12,14 +12,17 @@ class State(ABC):
         sequence_id (int):  Moment in time where this state occurred
 
     """
+    __slots__ = ('__game', '__sequence_i')
 
-    def __init__(self, game, sequence_i=0):
+    def __init__(self, game, sequence_i=0, validate=True):
         """ Initializes a state
         Args:
             game       (Game): Game that the state belongs to
             sequence_i (int):  Moment in time where the state occurred i.e 0  it's how the game started
+            validate   (bool): if the sequence is checked
         """
-        assert_or_throw(sequence_i >= 0, InvalidStateSequence())
+        if validate:
+            assert_or_throw(sequence_i >= 0, InvalidStateSequence())
         self.__game = game
         self.__sequence_i = sequence_i
 
@@ -41,6 +44,9 @@ class State(ABC):
     def get_valid_actions_next_state_map(self):
         pass
 
+    def get_valid_actions(self):
+        return self.game.get_valid_actions(self)
+
     @abstractmethod
     def apply(self, action):
         pass
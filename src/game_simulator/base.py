@@ -4,14 +4,33 @@ import sys
 logging.getLogger().setLevel(logging.INFO)
 
 
-def simulate_game(game_state, agent, collector, max_actions=sys.maxsize):
+def simulate_game(game_state, agent, collector, max_actions=sys.maxsize, search_stats=None):
+    """Plays a game with the agent from the state
+    Args:
+        game_state   (GameState):                    state the game starts from
+        agent        (Agent):                        agent selecting the actions
+        collector    (AlphaZeroExperienceCollector): collector of the decisions of the agent
+        max_actions  (int):                          max number of actions played
+        search_stats (SearchStats):                  statistics where the searches of the agent are added up,
+                                                     optional. Only used if the agent keeps the statistics of its
+                                                     last search
+    Returns:
+        game_state (GameState): state the game ended in
+    """
     collector.begin_episode()
     actions_count = 0
     game = game_state.game
     while not game.is_over(game_state) and actions_count < max_actions:
         action = agent.select_action(game_state)
+        if search_stats is not None and hasattr(agent, 'search_stats'):
+            search_stats.add(agent.search_stats)
+        if action is None:
+            # No valid actions left
+            break
         game_state = game_state.apply(action)
         actions_count += 1
     collector.complete_episode(game_state.get_value())
     logging.info('Finished after ' + str(actions_count) + ' actions')
+    if search_stats is not None:
+        logging.info(f'Search: {search_stats}')
     return game_state
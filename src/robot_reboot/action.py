@@ -1,6 +1,9 @@
 from src.exceptions.exceptions import RequiredValueException
 from src.game.action import Action
 from src.exceptions.util import assert_or_throw
+from src.robot_reboot.direction import Direction
+
+DIRECTIONS = list(Direction)
 
 
 class RobotRebootAction(Action):
@@ -9,7 +12,10 @@ class RobotRebootAction(Action):
     Attributes:
         robot_id  (int):       robot's id to move
         direction (Direction): direction where the robot is moving (N, S, E, W)
+        action_id (int):       index of the action in the game actions, the same for every game. It's used by the
+                               encoders and agents to index the actions
     """
+    __slots__ = ('__robot_id', '__direction', '__action_id')
 
     def __init__(self, robot_id, direction):
         """
@@ -22,6 +28,7 @@ class RobotRebootAction(Action):
         assert_or_throw(direction is not None, RequiredValueException("direction"))
         self.__robot_id = robot_id
         self.__direction = direction
+        self.__action_id = robot_id * len(DIRECTIONS) + DIRECTIONS.index(direction)
 
     @property
     def robot_id(self):
@@ -31,11 +38,41 @@ class RobotRebootAction(Action):
     def direction(self):
         return self.__direction
 
+    @property
+    def action_id(self):
+        return self.__action_id
+
     def __str__(self):
         return f'Moving robot {self.__robot_id} on {self.__direction}'
 
     def __eq__(self, obj):
-        return isinstance(obj, RobotRebootAction) and obj.robot_id == self.__robot_id and obj.direction == self.__direction
+        return isinstance(obj, RobotRebootAction) and obj.action_id == self.__action_id
 
     def __hash__(self):
-        return hash(tuple((self.robot_id, self.direction)))
+        return self.__action_id
+
+
+_actions = []
+
+
+def get_action_by_id(action_id):
+    """Gets the action for an action id, the same action instance is returned for an id
+    Args:
+        action_id (int): action id
+    Returns:
+        action (RobotRebootAction): action with the given id
+    """
+    while len(_actions) <= action_id:
+        robot_id, direction_index = divmod(len(_actions), len(DIRECTIONS))
+        _actions.append(RobotRebootAction(robot_id, DIRECTIONS[direction_index]))
+    return _actions[action_id]
+
+
+def get_actions(n_robots):
+    """Gets the actions for a game with n robots, ordered by action id
+    Args:
+        n_robots (int): number of robots in the game
+    Returns:
+        actions (list): list of RobotRebootAction where actions[i].action_id is i
+    """
+    return [get_action_by_id(i) for i in range(n_robots * len(DIRECTIONS))]
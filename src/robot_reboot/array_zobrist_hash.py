@@ -0,0 +1,82 @@
+import numpy as np
+
+from src.robot_reboot.zobrist_hash import ZobristHash
+
+MAX63 = 0x7fffffffffffffff
+DEFAULT_SEED = 26
+
+
+class ArrayZobristHash(ZobristHash):
+    """Zobrist hash with one random code for each (row, col, robot) of the maze. Codes are generated from a seed, so
+    the same seed always produces the same codes for a maze shape and number of robots.
+    Attributes:
+        robots_count (int):      number of robots used to generate the hash
+        maze_shape   (tuple):    maze size used to generate the hash
+        values       (np array): uint64 array with shape (rows, cols, robots_count) with the code of each robot
+                                 in each cell
+    """
+
+    def __init__(self, robots_count, maze_shape, seed=DEFAULT_SEED):
+        """Initializes a zobrist hash
+        Args:
+            robots_count (int):   number of robots in the game
+            maze_shape   (tuple): (rows, cols) of the maze
+            seed         (int):   seed used to generate the codes
+        """
+        rows, cols = maze_shape
+        self.__robots_count = robots_count
+        self.__maze_shape = (rows, cols)
+        self.__seed = seed
+        rng = np.random.default_rng(seed)
+        self.__values = rng.integers(1, MAX63, size=(rows, cols, robots_count), dtype=np.uint64, endpoint=True)
+        # Python ints for single lookups, indexing the numpy array one value at a time is slower
+        self.__values_list = self.__values.tolist()
+
+    @property
+    def robots_count(self):
+        """
+        Number of robots used to generate the hash
+        """
+        return self.__robots_count
+
+    @property
+    def maze_shape(self):
+        """
+        Maze size used to generate the hash
+        """
+        return self.__maze_shape
+
+    def __reduce__(self):
+        # The codes are generated again from the seed instead of pickling them
+        return ArrayZobristHash, (self.__robots_count, self.__maze_shape, self.__seed)
+
+    @property
+    def empty(self):
+        """
+        Value for an empty maze
+        """
+        return 0
+
+    @property
+    def values(self):
+        return self.__values
+
+    def get_value(self, pos, robot_id):
+        """
+        Code for a robot in a position of the maze
+        """
+        x, y = pos
+        return self.__values_list[x][y][robot_id]
+
+    def hash_positions(self, robots_positions):
+        """Calculates the hash for a batch of robots positions at once
+        Args:
+            robots_positions (np array): int array with shape (n, robots_count, 2) where robots_positions[i, r] is the
+                                         (x, y) of robot r in the i-th position
+        Returns:
+            hashes (np array): uint64 array with shape (n,) with the hash of each position
+        """
+        robots_positions = np.asarray(robots_positions)
+        robots = np.arange(self.__robots_count)
+        codes = self.__values[robots_positions[..., 0], robots_positions[..., 1], robots]
+        return np.bitwise_xor.reduce(codes, axis=-1)
@@ -5,12 +5,11 @@ from src.exceptions.robot_reboot.game import NoRobotsGameException, InvalidMazeE
     MazeNotSquareException, MazeSizeInvalidException, RobotHouseInvalidRobotIdException
 from src.exceptions.util import assert_or_throw
 from src.game.game import Game
-from src.robot_reboot.action import RobotRebootAction
+from src.robot_reboot.action import RobotRebootAction, get_actions
 from src.robot_reboot.state import RobotRebootState
 from .direction import Direction
 from .goal_house import RobotRebootGoalHouse
-from .maze_cell_type import MazeCellType
-from .util import valid_maze, is_even
+from .util import valid_maze, get_slide_stops, get_lower_bounds, get_maze_id
 
 
 def get_game_from_matrix(matrix):
@@ -38,6 +37,46 @@ def get_game_from_matrix(matrix):
     return game, state
 
 
+def get_next_zobrist_hash(state: RobotRebootState, robot_id, new_pos):
+    """Derives the zobrist hash of the state produced by moving a robot, the robot is removed from its current cell
+    and placed in the new one, the rest of the robots don't change.
+    Args:
+        state    (RobotRebootState): state before the robot moves
+        robot_id (int):              robot that moves
+        new_pos  (tuple):            (x, y) where the robot is moved to
+    Returns:
+        zobrist_hash (int): hash for the next state or None when the state has no zobrist hash generator
+    """
+    zobrist_hash_generator = state.zobrist_hash_generator
+    if not zobrist_hash_generator:
+        return None
+    return state.zobrist_hash ^ zobrist_hash_generator.get_value(state.robots_positions[robot_id], robot_id) ^ \
+        zobrist_hash_generator.get_value(new_pos, robot_id)
+
+
+LOWER_BOUNDS_CACHE_SIZE = 4096
+_lower_bounds_cache = {}
+
+
+def get_cached_lower_bounds(maze, goal):
+    """Gets the lower bounds for a maze and goal, they are calculated once for mazes with the same walls and shared by
+    all the games in the process. The oldest entries are dropped when there are more than LOWER_BOUNDS_CACHE_SIZE
+    Args:
+        maze (np array): maze with walls and empty cells
+        goal (tuple):    (x, y) position of the goal
+    Returns:
+        lower_bounds (list): list of lists where lower_bounds[x][y] is the min number of moves from (x, y) to the goal
+    """
+    key = (get_maze_id(maze), (int(goal[0]), int(goal[1])))
+    lower_bounds = _lower_bounds_cache.get(key)
+    if lower_bounds is None:
+        if len(_lower_bounds_cache) >= LOWER_BOUNDS_CACHE_SIZE:
+            del _lower_bounds_cache[next(iter(_lower_bounds_cache))]
+        lower_bounds = get_lower_bounds(maze, goal)
+        _lower_bounds_cache[key] = lower_bounds
+    return lower_bounds
+
+
 class RobotRebootGame(Game):
     """
     Robot Reboot game, its maze and number of robots to move.
@@ -63,10 +102,15 @@ class RobotRebootGame(Game):
         assert_or_throw(goal_house.robot_id < n_robots, RobotHouseInvalidRobotIdException())
         assert_or_throw(maze.shape[0] == maze.shape[1], MazeNotSquareException())
         assert_or_throw(maze.shape[0] % 2 != 0, MazeSizeInvalidException())
-        Game.__init__(self, [RobotRebootAction(r, d) for r in range(n_robots) for d in Direction])
+        Game.__init__(self, get_actions(n_robots))
         self.__n_robots = n_robots
         self.__maze = maze
         self.__goal_house = goal_house
+        self.__lower_bounds = None
+        self.__maze_id = None
+        self.__slide_stops = get_slide_stops(maze)
+        self.__north_stops, self.__east_stops, self.__south_stops, self.__west_stops = \
+            (self.__slide_stops[d] for d in Direction)
 
     @property
     def robots_count(self):
@@ -76,6 +120,13 @@ class RobotRebootGame(Game):
     def maze(self):
         return self.__maze
 
+    @property
+    def maze_id(self):
+        """Id shared by all the games with the same maze walls"""
+        if self.__maze_id is None:
+            self.__maze_id = get_maze_id(self.__maze)
+        return self.__maze_id
+
     @property
     def maze_shape(self):
         return self.__maze.shape
@@ -84,6 +135,24 @@ class RobotRebootGame(Game):
     def goal_house(self):
         return self.__goal_house
 
+    @property
+    def lower_bounds(self):
+        """Min number of moves the goal robot needs to get to its house from every cell, if it could stop anywhere.
+        Other robots can only stop it where a wall doesn't, so the real number of moves is never lower"""
+        if self.__lower_bounds is None:
+            self.__lower_bounds = get_cached_lower_bounds(self.__maze, self.__goal_house.house)
+        return self.__lower_bounds
+
+    def get_lower_bound(self, state: RobotRebootState):
+        """Min number of actions needed to finish the game from a state
+        Args:
+            state (RobotRebootState): state to evaluate
+        Returns:
+            moves (int): lower bound of the actions needed, UNREACHABLE if the game can't be finished
+        """
+        x, y = state.robots_positions[self.__goal_house.robot_id]
+        return self.lower_bounds[x][y]
+
     def get_value(self, state: RobotRebootState):
         return 1 if state.robots_positions[self.__goal_house.robot_id] == self.__goal_house.house else 0
 
@@ -94,75 +163,128 @@ class RobotRebootGame(Game):
         return state.sequence_i * -1
 
     def apply(self, action: RobotRebootAction, state: RobotRebootState):
-        pos = state.robots_positions[action.robot_id]
-        robot_x, robot_y = pos
-        maze = self.__place_robots_on_maze(state.robots_positions)
-        rows, cols = maze.shape
-        if action.direction == Direction.North:
-            walls = np.argwhere(maze[:robot_x, robot_y] == MazeCellType.WALL.value)
-            if walls.size == 0:
-                return self.__move_to(action.robot_id, (0, robot_y), state)
-            else:
-                new_x = walls[walls.size - 1][0] + 1
-                if not is_even(new_x):
-                    new_x += 1
-                return self.__move_to(action.robot_id, (new_x, robot_y), state)
-        elif action.direction == Direction.South:
-            walls = np.argwhere(maze[robot_x + 1:, robot_y] == MazeCellType.WALL.value)
-            if walls.size == 0:
-                return self.__move_to(action.robot_id, (rows - 1, robot_y), state)
-            else:
-                new_x = walls[0][0] + robot_x
-                if not is_even(new_x):
-                    new_x -= 1
-                return self.__move_to(action.robot_id, (new_x, robot_y), state)
-        elif action.direction == Direction.West:
-            walls = np.argwhere(maze[robot_x, :robot_y] == MazeCellType.WALL.value)
-            if walls.size == 0:
-                return self.__move_to(action.robot_id, (robot_x, 0), state)
-            else:
-                new_y = walls[walls.size - 1][0] + 1
-                if not is_even(new_y):
-                    new_y += 1
-                return self.__move_to(action.robot_id, (robot_x, new_y), state)
-        elif action.direction == Direction.East:
-            walls = np.argwhere(maze[robot_x, robot_y + 1:] == MazeCellType.WALL.value)
-            if walls.size == 0:
-                return self.__move_to(action.robot_id, (robot_x, cols - 1), state)
-            else:
-                new_y = walls[0][0] + robot_y
-                if not is_even(new_y):
-                    new_y -= 1
-                return self.__move_to(action.robot_id, (robot_x, new_y), state)
-        else:
+        return self._move_to(action.robot_id, self.get_destination(action, state), state)
+
+    def get_destination(self, action: RobotRebootAction, state: RobotRebootState):
+        """Finds where the robot moved by the action stops, without creating the next state
+        Args:
+            action (RobotRebootAction): action to apply to the given state
+            state  (RobotRebootState):  state the action is applied on
+        Returns:
+            position (tuple): (x, y) where the robot stops
+        """
+        return self.slide(action.robot_id, action.direction, state.robots_positions)
+
+    def slide(self, robot_id, direction: Direction, robots_positions):
+        """Finds where a robot stops when it moves on a direction
+        Args:
+            robot_id         (int):       robot that moves
+            direction        (Direction): direction the robot moves to
+            robots_positions (list):      (x, y) of every robot, it can be any sequence of positions
+        Returns:
+            position (tuple): (x, y) where the robot stops
+        """
+        robot_x, robot_y = robots_positions[robot_id]
+        if direction not in self.__slide_stops:
             raise Exception("Unsupported direction")
+        # Walls are resolved by the precomputed stops, only robots on the way can stop the robot earlier
+        stop = self.__slide_stops[direction][robot_x][robot_y]
+        if direction == Direction.North:
+            for x, y in robots_positions:
+                if y == robot_y and stop <= x < robot_x:
+                    stop = x + 2
+            return stop, robot_y
+        elif direction == Direction.South:
+            for x, y in robots_positions:
+                if y == robot_y and robot_x < x <= stop:
+                    stop = x - 2
+            return stop, robot_y
+        elif direction == Direction.West:
+            for x, y in robots_positions:
+                if x == robot_x and stop <= y < robot_y:
+                    stop = y + 2
+            return robot_x, stop
+        else:
+            for x, y in robots_positions:
+                if x == robot_x and robot_y < y <= stop:
+                    stop = y - 2
+            return robot_x, stop
 
-    def __place_robots_on_maze(self, robots_positions):
-        maze = self.__maze.copy()
-        for x, y in robots_positions:
-            maze[x, y] = MazeCellType.WALL.value
-        return maze
+    def slide_all(self, robots_positions):
+        """Finds where every robot stops on every direction, checking the robots on the way once per robot
+        Args:
+            robots_positions (list): (x, y) of every robot, it can be any sequence of positions
+        Returns:
+            positions (list): (x, y) where each robot stops, the destination of an action is at its action id
+        """
+        destinations = []
+        for robot_x, robot_y in robots_positions:
+            north = self.__north_stops[robot_x][robot_y]
+            east = self.__east_stops[robot_x][robot_y]
+            south = self.__south_stops[robot_x][robot_y]
+            west = self.__west_stops[robot_x][robot_y]
+            for x, y in robots_positions:
+                if y == robot_y:
+                    if north <= x < robot_x:
+                        north = x + 2
+                    elif robot_x < x <= south:
+                        south = x - 2
+                elif x == robot_x:
+                    if west <= y < robot_y:
+                        west = y + 2
+                    elif robot_y < y <= east:
+                        east = y - 2
+            destinations += [(north, robot_y), (robot_x, east), (south, robot_y), (robot_x, west)]
+        return destinations
 
-    def __move_to(self, robot_id, new_pos, state: RobotRebootState):
+    def _move_to(self, robot_id, new_pos, state: RobotRebootState, zobrist_hash=None):
         robots_positions = state.robots_positions.copy()
         robots_positions[robot_id] = new_pos
+        if zobrist_hash is None:
+            zobrist_hash = get_next_zobrist_hash(state, robot_id, new_pos)
         return RobotRebootState(self, robots_positions, state.sequence_i + 1, previous_state=state,
-                                zobrist_hash_generator=state.zobrist_hash_generator)
+                                zobrist_hash_generator=state.zobrist_hash_generator, zobrist_hash=zobrist_hash,
+                                validate=False)
 
     def get_valid_actions_next_state_map(self, state: RobotRebootState):
-        valid_actions = {}
-        for action in self.actions:
+        return {action: self._move_to(action.robot_id, new_pos, state, zobrist_hash=next_hash)
+                for action, new_pos, next_hash in state.get_valid_moves()}
+
+    def get_valid_actions(self, state: RobotRebootState):
+        return [action for action, _, _ in state.get_valid_moves()]
+
+    def get_valid_actions_destinations_map(self, state: RobotRebootState):
+        """Finds the valid actions and where the moved robot stops, without creating the next states
+        Args:
+            state (RobotRebootState): state to check which actions will produce a different state
+        Returns:
+            valid_actions (dict): key: valid action and value: (x, y) where the robot moved by the action stops
+        """
+        return {action: new_pos for action, new_pos, _ in state.get_valid_moves()}
 
-            next_state = self.apply(action, state)
-            next_robot_positions = next_state.robots_positions
-            moved_to_goal_house = next_state.robots_positions[action.robot_id] == self.goal_house.house
-            is_correct_robot_goal = action.robot_id is self.goal_house.robot_id
-            if state.robots_positions != next_robot_positions and \
-                    next_state.zobrist_hash not in state.previous_states:
-                if moved_to_goal_house:
-                    if is_correct_robot_goal:
-                        valid_actions[action] = next_state
-                else:
-                    valid_actions[action] = next_state
-
-        return valid_actions
+    def get_valid_moves(self, state: RobotRebootState):
+        """Finds the actions that move a robot to a state not visited before. A robot that isn't the goal robot can't
+        stop on the goal house. The state keeps them, state.get_valid_moves() computes them once per state
+        Args:
+            state (RobotRebootState): state to check which actions will produce a different state
+        Returns:
+            valid_moves (tuple): action, (x, y) where the moved robot stops and zobrist hash of the next state of every
+                                 valid action
+        """
+        robots_positions = state.robots_positions
+        goal_robot_id = self.__goal_house.robot_id
+        goal = self.__goal_house.house
+        valid_moves = []
+        # Destinations and hashes are checked first, so only the states that are kept are created
+        destinations = self.slide_all(robots_positions)
+        for action in self.actions:
+            robot_id = action.robot_id
+            pos = robots_positions[robot_id]
+            new_pos = destinations[action.action_id]
+            if new_pos == pos or (new_pos == goal and robot_id != goal_robot_id):
+                continue
+            next_hash = get_next_zobrist_hash(state, robot_id, new_pos)
+            if next_hash is not None and next_hash in state.previous_states:
+                continue
+            valid_moves.append((action, new_pos, next_hash))
+        return tuple(valid_moves)
@@ -0,0 +1,252 @@
+import time
+from collections import deque
+
+from src.robot_reboot.game import RobotRebootGame
+from src.robot_reboot.state import RobotRebootState
+from src.robot_reboot.util import get_zobrish_hash, UNREACHABLE
+
+DEFAULT_MAX_DEPTH = 20
+
+
+class SolverResult:
+    """Result of solving a robot reboot game
+    Attributes:
+        actions        (list): shortest list of actions that takes the robot to its house, None if the game couldn't be
+                               solved within the max depth or the search was stopped
+        nodes_expanded (int):  number of states whose next states were generated
+        stop_reason    (str):  'nodes' or 'time' when the search was stopped by its budget before finishing, None
+                               otherwise
+    """
+
+    def __init__(self, actions, nodes_expanded, stop_reason=None):
+        self.__actions = actions
+        self.__nodes_expanded = nodes_expanded
+        self.__stop_reason = stop_reason
+
+    @property
+    def actions(self):
+        return self.__actions
+
+    @property
+    def nodes_expanded(self):
+        return self.__nodes_expanded
+
+    @property
+    def stop_reason(self):
+        return self.__stop_reason
+
+    @property
+    def solved(self):
+        return self.__actions is not None
+
+    def __str__(self):
+        if self.__stop_reason is not None:
+            return f'Stopped by {self.__stop_reason} after expanding {self.__nodes_expanded} nodes'
+        if not self.solved:
+            return f'Not solved after expanding {self.__nodes_expanded} nodes'
+        return f'Solved in {len(self.__actions)} actions after expanding {self.__nodes_expanded} nodes'
+
+
+class RobotRebootSolver:
+    """Finds the shortest sequence of actions that takes the robot to its house. Moves follow the same rules as
+    RobotRebootGame.get_valid_actions_next_state_map, so the solution can be played on the game. When the state solved
+    has a zobrist hash, the states played before it can't be visited again either.
+    States are identified by their zobrist hash, which is used as transposition table.
+    Attributes:
+        game      (RobotRebootGame): game to solve
+        max_depth (int):             max number of actions of a solution
+    """
+
+    def __init__(self, game: RobotRebootGame, max_depth=DEFAULT_MAX_DEPTH, zobrist_hash_generator=None):
+        """Initializes a solver
+        Args:
+            game                   (RobotRebootGame): game to solve
+            max_depth              (int):             max number of actions of a solution
+            zobrist_hash_generator (ZobristHash):     hash used for the transposition table when the state solved
+                                                      has none, the one shared for the game robots and maze shape is
+                                                      used if not provided
+        """
+        self.__game = game
+        self.__max_depth = max_depth
+        if zobrist_hash_generator is None:
+            zobrist_hash_generator = get_zobrish_hash(game.robots_count, game.maze_shape)
+        self.__zobrist_hash_generator = zobrist_hash_generator
+        self.__lower_bounds = game.lower_bounds
+
+    @property
+    def game(self):
+        return self.__game
+
+    @property
+    def max_depth(self):
+        return self.__max_depth
+
+    def bfs(self, state: RobotRebootState, max_nodes=None, timeout=None):
+        """Solves the game with a breadth first search
+        Args:
+            state     (RobotRebootState): state to solve the game from
+            max_nodes (int):              max number of states to expand, optional
+            timeout   (float):            max number of seconds to search, optional
+        Returns:
+            result (SolverResult): shortest solution and search statistics
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        positions = self.__get_positions(state)
+        if self.__is_solved(positions):
+            return SolverResult([], 0)
+        zobrist_hash_generator = self.__get_zobrist_hash_generator(state)
+        history = self.__get_history(state)
+        zobrist_hash = self.__hash(positions, zobrist_hash_generator)
+        parents = {zobrist_hash: None}
+        queue = deque([(positions, zobrist_hash, 0)])
+        nodes_expanded = 0
+        goal_robot_id = self.__game.goal_house.robot_id
+        goal = self.__game.goal_house.house
+        while queue:
+            positions, zobrist_hash, depth = queue.popleft()
+            if depth >= self.__max_depth:
+                continue
+            stop_reason = self.__get_stop_reason(nodes_expanded, max_nodes, deadline)
+            if stop_reason is not None:
+                return SolverResult(None, nodes_expanded, stop_reason)
+            nodes_expanded += 1
+            for action, new_pos in self.__next_positions(positions):
+                robot_id = action.robot_id
+                next_hash = zobrist_hash ^ zobrist_hash_generator.get_value(positions[robot_id], robot_id) ^ \
+                    zobrist_hash_generator.get_value(new_pos, robot_id)
+                if next_hash in parents or next_hash in history:
+                    continue
+                parents[next_hash] = (zobrist_hash, action)
+                if robot_id == goal_robot_id and new_pos == goal:
+                    return SolverResult(self.__get_path(parents, next_hash), nodes_expanded)
+                next_positions = positions[:robot_id] + (new_pos,) + positions[robot_id + 1:]
+                queue.append((next_positions, next_hash, depth + 1))
+        return SolverResult(None, nodes_expanded)
+
+    def ida_star(self, state: RobotRebootState, max_nodes=None, timeout=None):
+        """Solves the game with an iterative deepening A* search, using the moves the robot needs to get to its house
+        when it can stop anywhere as heuristic
+        Args:
+            state     (RobotRebootState): state to solve the game from
+            max_nodes (int):              max number of states to expand, counting the ones expanded again by every
+                                          iteration, optional
+            timeout   (float):            max number of seconds to search, optional
+        Returns:
+            result (SolverResult): shortest solution and search statistics
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        positions = list(self.__get_positions(state))
+        goal_robot_id = self.__game.goal_house.robot_id
+        goal = self.__game.goal_house.house
+        lower_bounds = self.__lower_bounds
+        zobrist_hash_generator = self.__get_zobrist_hash_generator(state)
+        history = self.__get_history(state)
+        path = []
+        nodes_expanded = 0
+        stop_reason = None
+        # Lowest number of actions each state was reached with in the current iteration, reaching it again with the
+        # same or more actions can't find a solution within the bound
+        transpositions = {}
+
+        def search(zobrist_hash, depth, bound):
+            nonlocal nodes_expanded, stop_reason
+            goal_x, goal_y = positions[goal_robot_id]
+            estimate = depth + lower_bounds[goal_x][goal_y]
+            if estimate > bound:
+                return False, estimate
+            if positions[goal_robot_id] == goal:
+                return True, depth
+            if transpositions.get(zobrist_hash, UNREACHABLE) <= depth:
+                return False, UNREACHABLE
+            stop_reason = self.__get_stop_reason(nodes_expanded, max_nodes, deadline)
+            if stop_reason is not None:
+                return False, UNREACHABLE
+            transpositions[zobrist_hash] = depth
+            nodes_expanded += 1
+            next_bound = UNREACHABLE
+            for action, new_pos in list(self.__next_positions(positions)):
+                robot_id = action.robot_id
+                old_pos = positions[robot_id]
+                next_hash = zobrist_hash ^ zobrist_hash_generator.get_value(old_pos, robot_id) ^ \
+                    zobrist_hash_generator.get_value(new_pos, robot_id)
+                if next_hash in history:
+                    continue
+                positions[robot_id] = new_pos
+                path.append(action)
+                found, child_bound = search(next_hash, depth + 1, bound)
+                positions[robot_id] = old_pos
+                if found:
+                    return True, child_bound
+                path.pop()
+                if stop_reason is not None:
+                    return False, UNREACHABLE
+                next_bound = min(next_bound, child_bound)
+            return False, next_bound
+
+        zobrist_hash = self.__hash(positions, zobrist_hash_generator)
+        bound = self.__lower_bound(positions)
+        while bound <= self.__max_depth:
+            transpositions.clear()
+            found, bound = search(zobrist_hash, 0, bound)
+            if found:
+                return SolverResult(path, nodes_expanded)
+            if stop_reason is not None:
+                return SolverResult(None, nodes_expanded, stop_reason)
+        return SolverResult(None, nodes_expanded)
+
+    @staticmethod
+    def __get_stop_reason(nodes_expanded, max_nodes, deadline):
+        """Checks if the budget of the search is spent before expanding one more state"""
+        if max_nodes is not None and nodes_expanded >= max_nodes:
+            return 'nodes'
+        if deadline is not None and time.monotonic() >= deadline:
+            return 'time'
+        return None
+
+    def __next_positions(self, positions):
+        """Yields the actions that change the positions with the new position of the moved robot. Robots that are not
+        the goal robot can't stop on the goal house"""
+        game = self.__game
+        goal_robot_id = game.goal_house.robot_id
+        goal = game.goal_house.house
+        for action, new_pos in zip(game.actions, game.slide_all(positions)):
+            robot_id = action.robot_id
+            if new_pos != positions[robot_id] and (new_pos != goal or robot_id == goal_robot_id):
+                yield action, new_pos
+
+    def __lower_bound(self, positions):
+        x, y = positions[self.__game.goal_house.robot_id]
+        return self.__lower_bounds[x][y]
+
+    def __is_solved(self, positions):
+        return positions[self.__game.goal_house.robot_id] == self.__game.goal_house.house
+
+    def __get_zobrist_hash_generator(self, state):
+        """Gets the hash of the state when it has one, so the states played before it can be checked"""
+        return state.zobrist_hash_generator or self.__zobrist_hash_generator
+
+    @staticmethod
+    def __get_history(state):
+        """Gets the hashes of the states played to get to the state, they can't be visited again"""
+        return state.previous_states if state.zobrist_hash_generator else frozenset()
+
+    @staticmethod
+    def __hash(positions, zobrist_hash_generator):
+        zobrist_hash = zobrist_hash_generator.empty
+        for robot_id, pos in enumerate(positions):
+            zobrist_hash ^= zobrist_hash_generator.get_value(pos, robot_id)
+        return zobrist_hash
+
+    @staticmethod
+    def __get_positions(state):
+        return tuple((int(x), int(y)) for x, y in state.robots_positions)
+
+    @staticmethod
+    def __get_path(parents, zobrist_hash):
+        path = []
+        while parents[zobrist_hash] is not None:
+            zobrist_hash, action = parents[zobrist_hash]
+            path.append(action)
+        path.reverse()
+        return path
+
@@ -3,10 +3,13 @@ from src.exceptions.robot_reboot.state import EmptyRobotsPositionException, Inva
     RobotsPositionsOnWallsPositionsExceptions
 from src.exceptions.util import assert_or_throw
 from src.game.state import State
+from src.robot_reboot.state_history import StateHistory
 
 
 class RobotRebootState(State):
     ROBOT_IN_CELL = 1
+    __slots__ = ('__robots_positions', '__previous_state', '__zobrist_hash_generator', '__zobrist_hash',
+                 '__previous_states', '__valid_moves')
 
     """
     State for the robot reboot game is defined by the positions of the robots.
@@ -15,39 +18,64 @@ class RobotRebootState(State):
                                  each index in the list represents a robot
     """
 
-    def __init__(self, game, robots_positions, sequence_i=0, previous_state=None, zobrist_hash_generator=None):
+    def __init__(self, game, robots_positions, sequence_i=0, previous_state=None, zobrist_hash_generator=None,
+                 zobrist_hash=None, validate=True, previous_states=None):
         """ Initializes a robot reboot state
         Args:
             sequence_i       (int):  Moment in time where the state occurred i.e 0  it's how the game started
             game             (Game): Game that the state belongs to
             robots_positions (list): list of (x,y) values defining where a robot is on the maze
                                      each index in the list represents a robot
+            zobrist_hash     (int):  hash for the robots positions when it's already known, i.e. derived from the
+                                     previous state. It's calculated with the zobrist_hash_generator otherwise
+            validate         (bool): if the robots positions are checked against the game. States created by the
+                                     game when applying an action are valid by construction and skip the checks
+            previous_states  (StateHistory): hashes of the states played to get to the state when they are already
+                                             known, i.e. the state is restored without its previous state. They are
+                                             taken from the previous state otherwise
         """
-        assert_or_throw(str(type(robots_positions)).__contains__("list"), InvalidRobotsList())
-        assert_or_throw(len(robots_positions) != 0, EmptyRobotsPositionException)
-        assert_or_throw(len([rp for rp in robots_positions if rp[0] < 0 or rp[1] < 0]) == 0,
-                        InvalidRobotsPositionException())
-        assert_or_throw(len([rp for rp in robots_positions if rp[0] % 2 != 0 or rp[1] % 2 != 0]) == 0,
-                        RobotsPositionsOnWallsPositionsExceptions())
-        assert_or_throw(len([rp for rp in robots_positions if rp[0] >= game.maze.shape[0] or rp[1] >= game.maze.shape[
-            1]]) == 0, RobotsPositionOutOfMazeBoundsException())
-        assert_or_throw(len(robots_positions) == game.robots_count, NumberRobotsNotMatchingException())
-
-        State.__init__(self, game, sequence_i)
+        if validate:
+            assert_or_throw(str(type(robots_positions)).__contains__("list"), InvalidRobotsList())
+            assert_or_throw(len(robots_positions) != 0, EmptyRobotsPositionException)
+            assert_or_throw(len([rp for rp in robots_positions if rp[0] < 0 or rp[1] < 0]) == 0,
+                            InvalidRobotsPositionException())
+            assert_or_throw(len([rp for rp in robots_positions if rp[0] % 2 != 0 or rp[1] % 2 != 0]) == 0,
+                            RobotsPositionsOnWallsPositionsExceptions())
+            assert_or_throw(len([rp for rp in robots_positions if rp[0] >= game.maze.shape[0] or
+                                 rp[1] >= game.maze.shape[1]]) == 0, RobotsPositionOutOfMazeBoundsException())
+            assert_or_throw(len(robots_positions) == game.robots_count, NumberRobotsNotMatchingException())
+
+        State.__init__(self, game, sequence_i, validate=validate)
 
         self.__robots_positions = robots_positions
         self.__previous_state = previous_state
         self.__zobrist_hash_generator = zobrist_hash_generator
         self.__zobrist_hash = None
         self.__previous_states = frozenset()
+        self.__valid_moves = None
 
         if self.__zobrist_hash_generator:
-            self.__zobrist_hash = self.__calculate_zobrist_hash()
-            if self.__previous_state is None:
-                self.__previous_states = frozenset({self.__zobrist_hash})
-            else:
-                self.__previous_states = frozenset(
-                    previous_state.previous_states | {self.__zobrist_hash})
+            self.__zobrist_hash = zobrist_hash if zobrist_hash is not None else self.__calculate_zobrist_hash()
+            if previous_states is not None:
+                self.__previous_states = previous_states
+                return
+            previous_history = None
+            if previous_state is not None and previous_state.zobrist_hash_generator:
+                previous_history = previous_state.previous_states
+            self.__previous_states = StateHistory(self.__zobrist_hash, previous_history)
+
+    def __reduce__(self):
+        # The state is pickled without its previous state and with the hashes of the states played as a flat set, so
+        # the size doesn't depend on the length of the game and pickling doesn't recurse once per action played
+        return restore_state, (self.__class__, {
+            'game': self.game,
+            'robots_positions': self.__robots_positions,
+            'sequence_i': self.sequence_i,
+            'zobrist_hash_generator': self.__zobrist_hash_generator,
+            'zobrist_hash': self.__zobrist_hash,
+            'validate': False,
+            'previous_states': self.__previous_states if self.__zobrist_hash_generator else None,
+        })
 
     def __calculate_zobrist_hash(self):
         if self.__zobrist_hash_generator:
@@ -84,6 +112,16 @@ class RobotRebootState(State):
     def get_valid_actions_next_state_map(self):
         return self.game.get_valid_actions_next_state_map(self)
 
+    def get_valid_moves(self):
+        """Gets the valid actions with the destination of the moved robot and the zobrist hash of the next state. They
+        are found by the game the first time, the state doesn't change so later calls reuse them
+        Returns:
+            valid_moves (tuple): (action, (x, y), zobrist hash) of every valid action
+        """
+        if self.__valid_moves is None:
+            self.__valid_moves = self.game.get_valid_moves(self)
+        return self.__valid_moves
+
     def apply(self, action):
         return self.game.apply(action, self)
 
@@ -92,3 +130,8 @@ class RobotRebootState(State):
 
     def __str__(self):
         return f'{self.__robots_positions}'
+
+
+def restore_state(state_class, kwargs):
+    """Creates a pickled state again"""
+    return state_class(**kwargs)
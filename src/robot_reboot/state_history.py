@@ -0,0 +1,88 @@
+CHECKPOINT_INTERVAL = 16
+
+
+class StateHistory:
+    """Zobrist hashes of the states played to get to a state, including the state itself.
+    Each history is linked to the history of the previous state and its hashes are kept as a checkpoint set shared
+    with the previous histories plus a small set with the most recent hashes. Every CHECKPOINT_INTERVAL states a new
+    checkpoint is created. The sets are built the first time the history is used, so creating a history is constant
+    time and checking if a hash was already played takes two set lookups.
+    Attributes:
+        zobrist_hash (int):          hash of the state the history belongs to
+        previous     (StateHistory): history of the previous state, None for the first state of a game
+    """
+    __slots__ = ('__zobrist_hash', '__previous', '__checkpoint', '__recent')
+
+    def __init__(self, zobrist_hash, previous=None):
+        """Initializes a state history
+        Args:
+            zobrist_hash (int):          hash of the state the history belongs to
+            previous     (StateHistory): history of the previous state, None for the first state of a game
+        """
+        self.__zobrist_hash = zobrist_hash
+        self.__previous = previous
+        self.__checkpoint = None
+        self.__recent = None
+
+    @classmethod
+    def from_hashes(cls, zobrist_hash, hashes):
+        """Creates a history without previous history that holds the given hashes
+        Args:
+            zobrist_hash (int):      hash of the state the history belongs to
+            hashes       (iterable): hashes of the states played before
+        Returns:
+            history (StateHistory): history with the hashes and the state hash
+        """
+        history = cls(zobrist_hash)
+        history.__checkpoint = frozenset(hashes)
+        history.__recent = frozenset({zobrist_hash})
+        return history
+
+    @property
+    def zobrist_hash(self):
+        return self.__zobrist_hash
+
+    @property
+    def previous(self):
+        return self.__previous
+
+    def __reduce__(self):
+        # Pickled as a flat set of hashes, pickling the links to the previous histories recurses once per state
+        return StateHistory.from_hashes, (self.__zobrist_hash, frozenset(self))
+
+    def __contains__(self, zobrist_hash):
+        if self.__recent is None:
+            self.__build()
+        return zobrist_hash in self.__recent or zobrist_hash in self.__checkpoint
+
+    def __iter__(self):
+        if self.__recent is None:
+            self.__build()
+        return iter(self.__checkpoint | self.__recent)
+
+    def __len__(self):
+        if self.__recent is None:
+            self.__build()
+        return len(self.__checkpoint | self.__recent)
+
+    def __build(self):
+        # Histories that haven't been used yet are built from the closest one that was, without recursion so long
+        # games don't reach the recursion limit
+        pending = []
+        history = self
+        while history is not None and history.__recent is None:
+            pending.append(history)
+            history = history.__previous
+        for history in reversed(pending):
+            previous = history.__previous
+            if previous is None:
+                history.__checkpoint = frozenset()
+                history.__recent = frozenset({history.__zobrist_hash})
+            else:
+                if len(previous.__recent) >= CHECKPOINT_INTERVAL:
+                    # The checkpoint is created once on the previous history and shared by all the histories that
+                    # follow it, states with many next states don't merge the same hashes again for each one
+                    previous.__checkpoint = previous.__checkpoint | previous.__recent
+                    previous.__recent = frozenset()
+                history.__checkpoint = previous.__checkpoint
+                history.__recent = previous.__recent | {history.__zobrist_hash}
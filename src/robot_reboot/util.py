@@ -1,9 +1,14 @@
+import hashlib
+from collections import deque
+
 import numpy as np
 
-from src.robot_reboot.classic_robot_reboot_hash import ClassicRobotRebootZobristHash
+from src.robot_reboot.array_zobrist_hash import ArrayZobristHash
 from src.robot_reboot.direction import Direction
 from src.robot_reboot.maze_cell_type import MazeCellType
 
+UNREACHABLE = 1 << 30
+
 
 def valid_maze(n_robots, maze):
     robot_cells = [i * 2 for i in range(int(n_robots / 2) + 1)]
@@ -15,6 +20,87 @@ def maze_only_walls_empty_cells(maze):
     return np.all(np.logical_or(maze == MazeCellType.EMPTY.value, maze == MazeCellType.WALL.value))
 
 
+def get_maze_id(maze):
+    """Gets an id for the walls of a maze, mazes with the same walls get the same id in any process
+    Args:
+        maze (np array): maze with walls and empty cells
+    Returns:
+        maze_id (str): hexadecimal digest of the maze shape and walls
+    """
+    walls = maze == MazeCellType.WALL.value
+    digest = hashlib.sha1(str(walls.shape).encode())
+    digest.update(np.packbits(walls).tobytes())
+    return digest.hexdigest()
+
+
+def get_slide_stops(maze):
+    """Calculates for every cell of the maze and every direction where a robot moving from that cell stops when there
+    are no other robots on the maze, i.e only walls stop it.
+    Args:
+        maze (np array): maze with walls and empty cells
+    Returns:
+        stops (dict): key: direction and value: list of lists where stops[direction][x][y] is the row (North/South)
+                      or column (East/West) where a robot moving from (x, y) stops
+    """
+    rows, cols = maze.shape
+    walls = (maze == MazeCellType.WALL.value).tolist()
+    stops = {d: [[0] * cols for _ in range(rows)] for d in Direction}
+    for y in range(cols):
+        stop = 0
+        for x in range(rows):
+            stops[Direction.North][x][y] = stop
+            if walls[x][y]:
+                stop = x + 1 if not is_even(x) else x + 2
+        stop = rows - 1
+        for x in reversed(range(rows)):
+            stops[Direction.South][x][y] = stop
+            if walls[x][y]:
+                stop = x - 1 if not is_even(x) else x - 2
+    for x in range(rows):
+        stop = 0
+        for y in range(cols):
+            stops[Direction.West][x][y] = stop
+            if walls[x][y]:
+                stop = y + 1 if not is_even(y) else y + 2
+        stop = cols - 1
+        for y in reversed(range(cols)):
+            stops[Direction.East][x][y] = stop
+            if walls[x][y]:
+                stop = y - 1 if not is_even(y) else y - 2
+    return stops
+
+
+def get_lower_bounds(maze, goal):
+    """Calculates for every cell the minimum number of moves a robot needs to get to the goal if it could stop in any
+    cell of its way, i.e. as if there always was another robot to stop it where it's needed. Real moves are a subset
+    of these moves, so the values are a lower bound of the moves needed to solve the game.
+    Args:
+        maze (np array): maze with walls and empty cells
+        goal (tuple):    (x, y) position of the goal
+    Returns:
+        lower_bounds (list): list of lists where lower_bounds[x][y] is the bound for a robot in (x, y),
+                             UNREACHABLE if the goal can't be reached from that cell
+    """
+    rows, cols = maze.shape
+    walls = (maze == MazeCellType.WALL.value).tolist()
+    lower_bounds = [[UNREACHABLE] * cols for _ in range(rows)]
+    goal_x, goal_y = goal
+    lower_bounds[goal_x][goal_y] = 0
+    queue = deque([(goal_x, goal_y)])
+    while queue:
+        x, y = queue.popleft()
+        moves = lower_bounds[x][y] + 1
+        for dx, dy in ((-1, 0), (1, 0), (0, -1), (0, 1)):
+            next_x, next_y = x + 2 * dx, y + 2 * dy
+            while 0 <= next_x < rows and 0 <= next_y < cols and not walls[next_x - dx][next_y - dy] and \
+                    not walls[next_x][next_y]:
+                if lower_bounds[next_x][next_y] == UNREACHABLE:
+                    lower_bounds[next_x][next_y] = moves
+                    queue.append((next_x, next_y))
+                next_x, next_y = next_x + 2 * dx, next_y + 2 * dy
+    return lower_bounds
+
+
 def get_opposite_direction(movement: Direction):
     if movement == Direction.North:
         return Direction.South
@@ -140,11 +226,26 @@ def is_even(n):
     return n % 2 == 0
 
 
+_zobrist_hashes = {}
+
+
 def get_zobrish_hash(robots_count, maze_size):
-    hashes = {
-        (4, (31, 31)): ClassicRobotRebootZobristHash()
-    }
-    zobrish_hash = hashes.get((robots_count, maze_size))
-    if zobrish_hash:
-        return zobrish_hash
-    raise KeyError('No zobrist hash available for the given values')
+    """Gets the zobrist hash for a number of robots and maze size. Hashes are created once and shared by all the
+    games in the process with the same values
+    Args:
+        robots_count (int):   number of robots in the game
+        maze_size    (tuple): (rows, cols) of the maze
+    Returns:
+        zobrist_hash (ArrayZobristHash): zobrist hash for the given values
+    Raises:
+        KeyError: if the maze is not squared or its size is not odd
+    """
+    rows, cols = maze_size
+    if robots_count <= 0 or rows != cols or rows % 2 == 0:
+        raise KeyError('No zobrist hash available for the given values')
+    key = (robots_count, (rows, cols))
+    zobrist_hash = _zobrist_hashes.get(key)
+    if zobrist_hash is None:
+        zobrist_hash = ArrayZobristHash(robots_count, (rows, cols))
+        _zobrist_hashes[key] = zobrist_hash
+    return zobrist_hash
@@ -1,11 +1,38 @@
 import unittest
 
+import numpy as np
+
 from src.agent.alphazero import AlphaZeroAgent
+from src.agent.evaluation_cache import EvaluationCache
+from src.exceptions.alphazero.agent import UnboundedSearchException
 from src.experience.alphazero_experience import AlphaZeroExperienceCollector
 from src.game_simulator.base import simulate_game
+from src.robot_reboot.state import RobotRebootState
 from test.robot_reboot.util import setup_and_get_encoder_state_model_for_robot_reboot_game
 
 
+def setup_and_get_encoder_unsolved_state_model():
+    """Same game as setup_and_get_encoder_state_model_for_robot_reboot_game where the robot needs 5 actions to get to
+    its house, so the game isn't over after the first action"""
+    encoder, game_state, model = setup_and_get_encoder_state_model_for_robot_reboot_game()
+    game_state = RobotRebootState(game_state.game, [(2, 2), (4, 4), (4, 2), (4, 0)],
+                                  zobrist_hash_generator=game_state.zobrist_hash_generator)
+    return encoder, game_state, model
+
+
+class DominantActionModel:
+    """Model giving all the prior to one action and a value of 0 to every state"""
+
+    def __init__(self, num_actions, action_id):
+        self.num_actions = num_actions
+        self.action_id = action_id
+
+    def predict(self, model_input):
+        priors = np.zeros((len(model_input), self.num_actions))
+        priors[:, self.action_id] = 1
+        return priors, np.zeros((len(model_input), 1))
+
+
 class TestAlphaZeroAgent(unittest.TestCase):
 
     def test_select_action_without_collector(self):
@@ -29,6 +56,188 @@ class TestAlphaZeroAgent(unittest.TestCase):
         self.assertNotEqual(next_state, game_state)
         self.assertEquals(2, len(next_state.previous_states))
 
+    def test_select_action_with_leaf_batch(self):
+        encoder, game_state, model = setup_and_get_encoder_unsolved_state_model()
+        collector = AlphaZeroExperienceCollector()
+        collector.begin_episode()
+        alphazero_agent = AlphaZeroAgent(model, encoder, rounds_per_action=5, collector=collector, leaf_batch_size=2)
+        action = alphazero_agent.select_action(game_state)
+        self.assertIsNotNone(action)
+        collector.complete_episode(0)
+        self.assertEqual(5, sum(collector.visit_counts[0]))
+
+    def assert_select_action_reuses_tree(self, **agent_settings):
+        encoder, game_state, model = setup_and_get_encoder_unsolved_state_model()
+        collector = AlphaZeroExperienceCollector()
+        collector.begin_episode()
+        alphazero_agent = AlphaZeroAgent(model, encoder, rounds_per_action=20, collector=collector, **agent_settings)
+        action = alphazero_agent.select_action(game_state)
+        alphazero_agent.select_action(game_state.apply(action))
+        collector.complete_episode(0)
+        self.assertEqual(20, sum(collector.visit_counts[0]))
+        # The kept root was expanded by the first of its visits, the rest of them are visits of its children. There are
+        # more rounds than actions, so the most visited action was visited more than once
+        kept_visits = collector.visit_counts[0][action.action_id] - 1
+        self.assertGreater(kept_visits, 0)
+        self.assertEqual(kept_visits + alphazero_agent.search_stats.rounds, sum(collector.visit_counts[1]))
+
+    def test_select_action_reuses_tree(self):
+        self.assert_select_action_reuses_tree()
+
+    def test_select_action_without_tree_reuse(self):
+        encoder, game_state, model = setup_and_get_encoder_unsolved_state_model()
+        collector = AlphaZeroExperienceCollector()
+        collector.begin_episode()
+        alphazero_agent = AlphaZeroAgent(model, encoder, rounds_per_action=4, collector=collector, reuse_tree=False)
+        action = alphazero_agent.select_action(game_state)
+        alphazero_agent.select_action(game_state.apply(action))
+        collector.complete_episode(0)
+        self.assertEqual(4, sum(collector.visit_counts[1]))
+
+    def test_select_action_with_array_tree(self):
+        self.assert_select_action_reuses_tree(array_tree=True, tree_capacity=2)
+
+    def test_select_action_with_shared_evaluation_cache(self):
+        encoder, game_state, model = setup_and_get_encoder_unsolved_state_model()
+        evaluation_cache = EvaluationCache()
+        alphazero_agent = AlphaZeroAgent(model, encoder, rounds_per_action=4, evaluation_cache=evaluation_cache,
+                                         model_id='model')
+        alphazero_agent.select_action(game_state)
+        self.assertLessEqual(evaluation_cache.hits + evaluation_cache.misses, 5)
+        hits = evaluation_cache.hits
+        other_agent = AlphaZeroAgent(model, encoder, rounds_per_action=4, evaluation_cache=evaluation_cache,
+                                     model_id='model')
+        other_agent.select_action(game_state)
+        self.assertGreater(evaluation_cache.hits, hits)
+
+    def test_select_action_wins_when_possible(self):
+        encoder, game_state, model = setup_and_get_encoder_state_model_for_robot_reboot_game()
+        alphazero_agent = AlphaZeroAgent(model, encoder, rounds_per_action=100, c=50.0)
+        action = alphazero_agent.select_action(game_state)
+        self.assertEqual(1, game_state.apply(action).get_value())
+        self.assertEqual('proven', alphazero_agent.search_stats.stop_reason)
+        self.assertLess(alphazero_agent.search_stats.rounds, 100)
+        self.assertEqual(1, alphazero_agent.search_stats.proven_depth)
+
+    def test_select_action_on_proven_root(self):
+        encoder, game_state, model = setup_and_get_encoder_unsolved_state_model()
+        # The robot can get to its house in 2 actions
+        game_state = RobotRebootState(game_state.game, [(0, 4), (2, 4), (4, 2), (4, 0)],
+                                      zobrist_hash_generator=game_state.zobrist_hash_generator)
+        alphazero_agent = AlphaZeroAgent(model, encoder, rounds_per_action=200, c=50.0)
+        action = alphazero_agent.select_action(game_state)
+        self.assertEqual('proven', alphazero_agent.search_stats.stop_reason)
+        self.assertIsNotNone(alphazero_agent.search_stats.proven_depth)
+        # The kept root is the shortest proven win, so no simulation is run
+        alphazero_agent.select_action(game_state.apply(action))
+        self.assertEqual('proven', alphazero_agent.search_stats.stop_reason)
+        self.assertEqual(0, alphazero_agent.search_stats.rounds)
+
+    def test_select_action_when_game_over(self):
+        encoder, game_state, model = setup_and_get_encoder_state_model_for_robot_reboot_game()
+        game_over_state = RobotRebootState(game_state.game, [(2, 2), (0, 0), (4, 2), (4, 4)])
+        alphazero_agent = AlphaZeroAgent(model, encoder, rounds_per_action=4)
+        self.assertIsNone(alphazero_agent.select_action(game_over_state))
+
+    def test_select_action_stops_on_node_budget(self):
+        encoder, game_state, model = setup_and_get_encoder_unsolved_state_model()
+        alphazero_agent = AlphaZeroAgent(model, encoder, rounds_per_action=None, node_budget=4, leaf_batch_size=3)
+        self.assertIsNotNone(alphazero_agent.select_action(game_state))
+        self.assertEqual('nodes', alphazero_agent.search_stats.stop_reason)
+        self.assertEqual(4, alphazero_agent.search_stats.nodes_added)
+
+    def test_select_action_stops_on_time_budget(self):
+        encoder, game_state, model = setup_and_get_encoder_unsolved_state_model()
+        alphazero_agent = AlphaZeroAgent(model, encoder, rounds_per_action=None, time_budget=0)
+        self.assertIsNotNone(alphazero_agent.select_action(game_state))
+        self.assertEqual('time', alphazero_agent.search_stats.stop_reason)
+        self.assertEqual(1, alphazero_agent.search_stats.rounds)
+
+    def test_select_action_stops_on_rounds(self):
+        encoder, game_state, model = setup_and_get_encoder_unsolved_state_model()
+        alphazero_agent = AlphaZeroAgent(model, encoder, rounds_per_action=5, time_budget=60, leaf_batch_size=2)
+        alphazero_agent.select_action(game_state)
+        self.assertEqual('rounds', alphazero_agent.search_stats.stop_reason)
+        self.assertEqual(5, alphazero_agent.search_stats.rounds)
+
+    def test_select_action_with_early_stop(self):
+        encoder, game_state, _ = setup_and_get_encoder_unsolved_state_model()
+        # Every simulation follows the action with all the prior, the others are never visited
+        dominant_action = game_state.get_valid_actions()[0]
+        model = DominantActionModel(encoder.num_actions(), dominant_action.action_id)
+        alphazero_agent = AlphaZeroAgent(model, encoder, rounds_per_action=20, reuse_tree=False)
+        self.assertEqual(dominant_action, alphazero_agent.select_action(game_state))
+        early_stop_agent = AlphaZeroAgent(model, encoder, rounds_per_action=20, reuse_tree=False, early_stop=True)
+        self.assertEqual(dominant_action, early_stop_agent.select_action(game_state))
+        stats = early_stop_agent.search_stats
+        # Decided once the dominant action has more visits than the rounds left
+        self.assertEqual('decided', stats.stop_reason)
+        self.assertLess(stats.rounds, 20)
+        self.assertEqual(20, stats.rounds + stats.rounds_saved)
+
+    def test_select_action_with_transpositions(self):
+        encoder, game_state, model = setup_and_get_encoder_unsolved_state_model()
+        collector = AlphaZeroExperienceCollector()
+        collector.begin_episode()
+        alphazero_agent = AlphaZeroAgent(model, encoder, rounds_per_action=50, collector=collector,
+                                         transpositions=True)
+        action = alphazero_agent.select_action(game_state)
+        stats = alphazero_agent.search_stats
+        self.assertGreater(stats.transpositions, 0)
+        self.assertLessEqual(stats.nodes_added + stats.transpositions, 51)
+        alphazero_agent.select_action(game_state.apply(action))
+        collector.complete_episode(0)
+        self.assertEqual(50, sum(collector.visit_counts[0]))
+        self.assertGreater(sum(collector.visit_counts[1]), 50)
+
+    def test_select_action_with_transpositions_in_array_tree(self):
+        encoder, game_state, model = setup_and_get_encoder_unsolved_state_model()
+        alphazero_agent = AlphaZeroAgent(model, encoder, rounds_per_action=50, reuse_tree=False, transpositions=True)
+        action = alphazero_agent.select_action(game_state)
+        array_tree_agent = AlphaZeroAgent(model, encoder, rounds_per_action=50, reuse_tree=False, transpositions=True,
+                                          array_tree=True)
+        self.assertEqual(action, array_tree_agent.select_action(game_state))
+        self.assertEqual(alphazero_agent.search_stats.transpositions, array_tree_agent.search_stats.transpositions)
+
+    def test_select_action_with_profile(self):
+        encoder, game_state, model = setup_and_get_encoder_unsolved_state_model()
+        alphazero_agent = AlphaZeroAgent(model, encoder, rounds_per_action=10, profile=True)
+        alphazero_agent.select_action(game_state)
+        stats = alphazero_agent.search_stats
+        self.assertEqual(1, stats.searches)
+        self.assertGreater(stats.max_depth, 0)
+        self.assertLessEqual(stats.evaluations, stats.nodes_added)
+        self.assertGreater(stats.selection_sec, 0)
+        self.assertGreater(stats.inference_sec, 0)
+        self.assertLessEqual(stats.profiled_sec, stats.time_sec)
+
+    def test_select_action_without_profile(self):
+        encoder, game_state, model = setup_and_get_encoder_unsolved_state_model()
+        alphazero_agent = AlphaZeroAgent(model, encoder, rounds_per_action=10)
+        alphazero_agent.select_action(game_state)
+        self.assertGreater(alphazero_agent.search_stats.evaluations, 0)
+        self.assertEqual(0, alphazero_agent.search_stats.profiled_sec)
+
+    def test_select_action_encodes_every_state_once(self):
+        encoder, game_state, model = setup_and_get_encoder_unsolved_state_model()
+        encoded_states = []
+        encode = encoder.encode
+        encoder.encode = lambda state: encoded_states.append(encode(state)) or encoded_states[-1]
+        collector = AlphaZeroExperienceCollector()
+        collector.begin_episode()
+        alphazero_agent = AlphaZeroAgent(model, encoder, rounds_per_action=4, collector=collector)
+        action = alphazero_agent.select_action(game_state)
+        evaluations = alphazero_agent.search_stats.evaluations
+        alphazero_agent.select_action(game_state.apply(action))
+        evaluations += alphazero_agent.search_stats.evaluations
+        collector.complete_episode(0)
+        self.assertEqual(evaluations, len(encoded_states))
+        self.assertIs(encoded_states[0], collector.states[0])
+
+    def test_init_fails_without_rounds_or_budget(self):
+        encoder, game_state, model = setup_and_get_encoder_unsolved_state_model()
+        self.assertRaises(UnboundedSearchException, AlphaZeroAgent, model, encoder, rounds_per_action=None)
+
     def test_train_with_one_experience(self):
         encoder, game_state, model = setup_and_get_encoder_state_model_for_robot_reboot_game()
         collector = AlphaZeroExperienceCollector()
@@ -0,0 +1,155 @@
+import unittest
+
+import numpy as np
+
+from src.agent.array_tree import AlphaZeroArrayTree, NO_NODE
+from src.robot_reboot.action import get_action_by_id
+from src.robot_reboot.game import RobotRebootGame
+from src.robot_reboot.goal_house import RobotRebootGoalHouse
+from src.robot_reboot.state import RobotRebootState
+
+
+def get_state():
+    game = RobotRebootGame(2, np.zeros((5, 5)), RobotRebootGoalHouse(0, (2, 2)))
+    return RobotRebootState(game, [(0, 0), (4, 4)])
+
+
+class TestAlphaZeroArrayTree(unittest.TestCase):
+
+    def test_add_node(self):
+        tree = AlphaZeroArrayTree(8, capacity=2)
+        state = get_state()
+        priors = np.arange(8) / 28
+        root = tree.add_node(state, 0.5, priors)
+        self.assertEqual(1, tree.size)
+        self.assertEqual(0.5, root.value)
+        self.assertIsNone(root.parent)
+        self.assertIsNone(root.last_action)
+        self.assertEqual(list(state.get_valid_actions_next_state_map().keys()), list(root.actions()))
+        for action_id in range(8):
+            action = get_action_by_id(action_id)
+            valid = action in state.get_valid_actions_next_state_map()
+            self.assertEqual(valid, tree.valid[0, action_id])
+            self.assertAlmostEqual(priors[action_id] if valid else 0, root.prior(action))
+
+    def test_add_child_grows_pool(self):
+        tree = AlphaZeroArrayTree(8, capacity=1)
+        state = get_state()
+        root = tree.add_node(state, 0.5, np.ones(8) / 8)
+        action = next(iter(root.actions()))
+        child = tree.add_node(root.next_state(action), 0.2, np.ones(8) / 8, root, action)
+        self.assertEqual(2, tree.capacity)
+        self.assertTrue(root.has_child(action))
+        self.assertEqual(child, root.get_child(action))
+        self.assertEqual(root, child.parent)
+        self.assertEqual(action, child.last_action)
+
+    def test_next_state(self):
+        tree = AlphaZeroArrayTree(8)
+        state = get_state()
+        root = tree.add_node(state, 0.5, np.ones(8) / 8)
+        action = next(iter(root.actions()))
+        next_state = root.next_state(action)
+        self.assertEqual(state.apply(action).robots_positions, next_state.robots_positions)
+        self.assertIs(next_state, root.next_state(action))
+
+    def test_add_terminal_node(self):
+        tree = AlphaZeroArrayTree(8)
+        root = tree.add_node(get_state(), 0.5, np.ones(8) / 8)
+        self.assertIsNone(root.proven_value)
+        action = next(iter(root.actions()))
+        child = tree.add_node(root.next_state(action), 1, None, root, action, terminal=True)
+        self.assertEqual([], list(child.actions()))
+        self.assertEqual(1, child.proven_value)
+        self.assertEqual(0, child.proven_depth)
+        root.set_proven(1, 1)
+        self.assertEqual(1, root.proven_depth)
+
+    def test_select_branch(self):
+        tree = AlphaZeroArrayTree(8)
+        state = get_state()
+        first, *_, last = state.get_valid_actions_next_state_map().keys()
+        priors = np.zeros(8)
+        priors[last.action_id] = 1
+        root = tree.add_node(state, 0.5, priors)
+        self.assertEqual(last, root.select_branch(2.0))
+        root.record_visit(first, 100)
+        self.assertEqual(first, root.select_branch(2.0))
+        self.assertEqual(last, root.select_branch(2.0, excluded=[first]))
+
+    def test_virtual_loss(self):
+        tree = AlphaZeroArrayTree(8)
+        root = tree.add_node(get_state(), 0.5, np.ones(8) / 8)
+        action = next(iter(root.actions()))
+        root.add_virtual_loss(action, 1.0)
+        self.assertEqual(1, root.visit_count(action))
+        self.assertEqual(-1.0, root.expected_value(action))
+        root.revert_virtual_loss(action, 1.0)
+        root.record_visit(action, 0.5)
+        self.assertEqual(1, root.visit_count(action))
+        self.assertEqual(0.5, root.expected_value(action))
+        self.assertEqual(2, root.total_visit_count)
+
+    def test_subtree(self):
+        tree = AlphaZeroArrayTree(8)
+        root = tree.add_node(get_state(), 0.5, np.ones(8) / 8)
+        first, second = list(root.actions())[:2]
+        child = tree.add_node(root.next_state(first), 0.2, np.ones(8) / 8, root, first)
+        tree.add_node(root.next_state(second), 0.3, np.ones(8) / 8, root, second)
+        grandchild_action = next(iter(child.actions()))
+        tree.add_node(child.next_state(grandchild_action), 0.4, np.ones(8) / 8, child, grandchild_action)
+        child.record_visit(grandchild_action, 0.4)
+
+        new_root = tree.subtree(child.index)
+        self.assertEqual(2, new_root.tree.size)
+        self.assertEqual(0, new_root.index)
+        self.assertIsNone(new_root.parent)
+        self.assertEqual(child.state, new_root.state)
+        self.assertEqual(1, new_root.visit_count(grandchild_action))
+        self.assertEqual(0.4, new_root.get_child(grandchild_action).value)
+        self.assertEqual(new_root, new_root.get_child(grandchild_action).parent)
+        self.assertEqual(NO_NODE, new_root.tree.children[1].max())
+
+    def test_subtree_with_shared_node(self):
+        tree = AlphaZeroArrayTree(8)
+        root = tree.add_node(get_state(), 0.5, np.ones(8) / 8)
+        first, second = list(root.actions())[:2]
+        child = tree.add_node(root.next_state(first), 0.2, np.ones(8) / 8, root, first)
+        other_child = tree.add_node(root.next_state(second), 0.3, np.ones(8) / 8, root, second)
+        action = next(iter(child.actions()))
+        shared = tree.add_node(child.next_state(action), 0.4, np.ones(8) / 8, child, action)
+        other_child.add_child(action, shared)
+
+        new_root = tree.subtree(root.index)
+        self.assertEqual(4, new_root.tree.size)
+        self.assertEqual(new_root.get_child(first).get_child(action), new_root.get_child(second).get_child(action))
+
+    def test_select_leaf_and_backup(self):
+        tree = AlphaZeroArrayTree(8)
+        state = get_state()
+        first, *_, last = state.get_valid_actions_next_state_map().keys()
+        priors = np.zeros(8)
+        priors[first.action_id] = 1
+        root = tree.add_node(state, 0.5, priors)
+        child = tree.add_node(root.next_state(first), 0.2, np.ones(8) / 8, root, first)
+
+        path = tree.select_leaf(root.index, 2.0, 1.0, 1)
+        self.assertEqual(2, len(path))
+        self.assertEqual([root.index, child.index], path.nodes.tolist())
+        node, action = path.leaf()
+        self.assertEqual(child, node)
+        self.assertFalse(node.has_child(action))
+        self.assertEqual(-1.0, root.expected_value(first))
+        self.assertEqual(1, child.visit_count(action))
+
+        tree.backup(path, 0.5, 1.0)
+        self.assertEqual(1, root.visit_count(first))
+        self.assertEqual(0.5, root.expected_value(first))
+        self.assertEqual(0.5, child.expected_value(action))
+        self.assertEqual([child, root], path.reversed_nodes())
+
+        # A child proven not to win isn't selected while its siblings aren't proven
+        child.set_proven(0, 1)
+        path = tree.select_leaf(root.index, 2.0, 1.0, 1)
+        self.assertEqual(1, len(path))
+        self.assertNotEqual(first, path.leaf()[1])
@@ -0,0 +1,78 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from src.agent.evaluation_cache import EvaluationCache, get_evaluation_key
+from src.robot_reboot.action import RobotRebootAction
+from src.robot_reboot.direction import Direction
+from src.robot_reboot.game import RobotRebootGame
+from src.robot_reboot.goal_house import RobotRebootGoalHouse
+from src.robot_reboot.state import RobotRebootState
+from src.robot_reboot.util import get_zobrish_hash
+
+
+def get_state(maze=None):
+    maze = np.zeros((5, 5)) if maze is None else maze
+    game = RobotRebootGame(2, maze, RobotRebootGoalHouse(0, (2, 2)))
+    return RobotRebootState(game, [(0, 0), (4, 4)], zobrist_hash_generator=get_zobrish_hash(2, (5, 5)))
+
+
+class TestEvaluationCache(unittest.TestCase):
+
+    def test_get_and_put(self):
+        cache = EvaluationCache()
+        self.assertIsNone(cache.get('a'))
+        cache.put('a', [0.25, 0.75], 0.5)
+        priors, value = cache.get('a')
+        np.testing.assert_array_almost_equal([0.25, 0.75], priors)
+        self.assertEqual(0.5, value)
+        self.assertEqual(1, cache.hits)
+        self.assertEqual(1, cache.misses)
+        self.assertEqual(0.5, cache.hit_rate)
+
+    def test_least_recently_used_is_dropped(self):
+        cache = EvaluationCache(max_size=2)
+        cache.put('a', [1], 0)
+        cache.put('b', [1], 0)
+        cache.get('a')
+        cache.put('c', [1], 0)
+        self.assertEqual(2, len(cache))
+        self.assertIn('a', cache)
+        self.assertNotIn('b', cache)
+        self.assertIn('c', cache)
+
+    def test_save_and_load(self):
+        cache = EvaluationCache()
+        cache.put(('model', 1), [0.5, 0.5], 1.0)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'cache.pkl')
+            cache.save(path)
+            loaded = EvaluationCache()
+            self.assertEqual(1, loaded.load(path))
+            self.assertEqual(1.0, loaded.get(('model', 1))[1])
+            self.assertEqual(0, EvaluationCache().load(os.path.join(directory, 'missing.pkl')))
+
+    def test_evaluation_key(self):
+        state = get_state()
+        same_state = get_state(np.zeros((5, 5)))
+        self.assertEqual(get_evaluation_key('model', state), get_evaluation_key('model', same_state))
+        self.assertNotEqual(get_evaluation_key('model', state), get_evaluation_key('other', state))
+
+    def test_evaluation_key_depends_on_maze(self):
+        maze = np.zeros((5, 5))
+        maze[1, 2] = 1
+        self.assertNotEqual(get_evaluation_key('model', get_state()), get_evaluation_key('model', get_state(maze)))
+
+    def test_evaluation_key_depends_on_valid_actions(self):
+        state = get_state()
+        action = RobotRebootAction(0, Direction.East)
+        back_action = RobotRebootAction(0, Direction.West)
+        same_positions = state.apply(action).apply(back_action)
+        self.assertEqual(state.robots_positions, same_positions.robots_positions)
+        self.assertNotEqual(get_evaluation_key('model', state), get_evaluation_key('model', same_positions))
+
+    def test_evaluation_key_without_zobrist_hash(self):
+        game = RobotRebootGame(2, np.zeros((5, 5)), RobotRebootGoalHouse(0, (2, 2)))
+        self.assertIsNone(get_evaluation_key('model', RobotRebootState(game, [(0, 0), (4, 4)])))
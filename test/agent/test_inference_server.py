@@ -0,0 +1,63 @@
+import threading
+import unittest
+
+import numpy as np
+
+from src.agent.inference_server import InferenceServer
+
+
+class SumModel:
+    """Model returning the sum and the negative sum of every sample"""
+
+    def __init__(self):
+        self.calls = 0
+
+    def predict(self, model_input):
+        self.calls += 1
+        sums = model_input.reshape(len(model_input), -1).sum(axis=1)
+        return sums[:, None], -sums[:, None]
+
+
+class TestInferenceServer(unittest.TestCase):
+
+    def test_predict_without_starting(self):
+        model = SumModel()
+        server = InferenceServer(model)
+        priors, values = server.predict(np.ones((2, 3)))
+        np.testing.assert_array_equal([[3], [3]], priors)
+        np.testing.assert_array_equal([[-3], [-3]], values)
+        self.assertEqual(1, model.calls)
+
+    def test_predict_from_several_threads(self):
+        model = SumModel()
+        results = {}
+        barrier = threading.Barrier(8)
+
+        def predict(i):
+            barrier.wait()
+            results[i] = server.predict(np.full((2, 3), i))
+
+        with InferenceServer(model, max_batch_size=16, max_wait_seconds=1) as server:
+            threads = [threading.Thread(target=predict, args=(i,)) for i in range(8)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        for i in range(8):
+            priors, values = results[i]
+            np.testing.assert_array_equal([[3 * i], [3 * i]], priors)
+            np.testing.assert_array_equal([[-3 * i], [-3 * i]], values)
+        self.assertEqual(8, server.requests)
+        self.assertEqual(16, server.samples)
+        self.assertEqual(model.calls, server.batches)
+        self.assertLess(server.batches, 8)
+        self.assertFalse(server.running)
+
+    def test_predict_error(self):
+        class FailingModel:
+            def predict(self, model_input):
+                raise ValueError('Failed')
+
+        with InferenceServer(FailingModel()) as server:
+            self.assertRaises(ValueError, server.predict, np.ones((1, 3)))
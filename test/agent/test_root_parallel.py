@@ -0,0 +1,52 @@
+import tempfile
+import unittest
+
+from src.agent.root_parallel import RootParallelAlphaZeroAgent
+from src.experience.alphazero_experience import AlphaZeroExperienceCollector
+from src.robot_reboot.state import RobotRebootState
+from test.agent.test_alphazero import setup_and_get_encoder_unsolved_state_model
+
+
+class TestRootParallelAlphaZeroAgent(unittest.TestCase):
+
+    def setUp(self):
+        self.encoder, self.game_state, model = setup_and_get_encoder_unsolved_state_model()
+        self.model_dir = tempfile.TemporaryDirectory()
+        model.save(self.model_dir.name)
+
+    def tearDown(self):
+        self.model_dir.cleanup()
+
+    def test_select_action_merges_visit_counts(self):
+        collector = AlphaZeroExperienceCollector()
+        collector.begin_episode()
+        with RootParallelAlphaZeroAgent(self.model_dir.name, self.encoder, workers=2, collector=collector, seed=1,
+                                        rounds_per_action=10) as agent:
+            action = agent.select_action(self.game_state)
+            self.assertIn(action, self.game_state.get_valid_actions())
+            self.assertEqual(20, agent.search_stats.rounds)
+            action = agent.select_action(self.game_state.apply(action))
+        self.assertFalse(agent.running)
+        collector.complete_episode(0)
+        self.assertEqual(20, sum(collector.visit_counts[0]))
+        self.assertEqual(20, sum(collector.visit_counts[1]))
+
+    def test_select_action_is_reproducible(self):
+        actions = []
+        for _ in range(2):
+            with RootParallelAlphaZeroAgent(self.model_dir.name, self.encoder, workers=2, seed=1,
+                                            rounds_per_action=10) as agent:
+                actions.append(agent.select_action(self.game_state))
+        self.assertEqual(actions[0], actions[1])
+
+    def test_select_action_from_deep_state(self):
+        next_positions = self.game_state.apply(self.game_state.get_valid_actions()[0]).robots_positions
+        game_state = self.game_state
+        for i in range(1, 301):
+            robots_positions = next_positions if i % 2 else self.game_state.robots_positions
+            game_state = RobotRebootState(game_state.game, robots_positions, sequence_i=i, previous_state=game_state,
+                                          zobrist_hash_generator=game_state.zobrist_hash_generator)
+        with RootParallelAlphaZeroAgent(self.model_dir.name, self.encoder, workers=2, seed=1,
+                                        rounds_per_action=10) as agent:
+            action = agent.select_action(game_state)
+        self.assertIn(action, game_state.get_valid_actions())
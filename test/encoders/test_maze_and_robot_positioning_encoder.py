@@ -55,6 +55,13 @@ class TestMazeAndRobotPositioningEncoder(unittest.TestCase):
         self.__assert_robot_layers(encoded_state[:, :, 7:10], robot_3, [])
         self.__assert_robot_layers(encoded_state[:, :, 10:], robot_4, [(0, 4)])
 
+    def test_encode_with_destinations(self):
+        game = get_robot_reboot_game(maze_size=5)
+        game_state = RobotRebootState(game, [(0, 0), (4, 4), (2, 0), (4, 0)])
+        encoder = MazeAndRobotPositioningEncoder(game)
+        destinations = game.get_valid_actions_destinations_map(game_state)
+        np.testing.assert_equal(encoder.encode(game_state), encoder.encode(game_state, destinations=destinations))
+
     def __assert_robot_layers(self, robot_encoded_layers, robot_position, robot_future_positions_list,
                               robot_house_position=None):
         rows, cols, layers = robot_encoded_layers.shape
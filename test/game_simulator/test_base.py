@@ -1,6 +1,6 @@
 import unittest
 
-from src.agent.alphazero import AlphaZeroAgent
+from src.agent.alphazero import AlphaZeroAgent, SearchStats
 from src.experience.alphazero_experience import AlphaZeroExperienceCollector
 from src.game_simulator.base import simulate_game
 from test.robot_reboot.util import setup_and_get_encoder_state_model_for_robot_reboot_game
@@ -22,3 +22,12 @@ class GameSimulator(unittest.TestCase):
         final_state = simulate_game(game_state, alphazero_agent, collector)
         self.assertNotEqual(final_state, game_state)
         self.assertNotEqual(1, final_state.sequence_i)
+
+    def test_simulate_game_adds_up_search_stats(self):
+        encoder, game_state, model = setup_and_get_encoder_state_model_for_robot_reboot_game()
+        alphazero_agent = AlphaZeroAgent(model, encoder, rounds_per_action=2)
+        collector = AlphaZeroExperienceCollector()
+        search_stats = SearchStats()
+        final_state = simulate_game(game_state, alphazero_agent, collector, max_actions=3, search_stats=search_stats)
+        self.assertEqual(final_state.sequence_i, search_stats.searches)
+        self.assertEqual(2 * search_stats.searches, search_stats.rounds)
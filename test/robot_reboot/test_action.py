@@ -1,5 +1,5 @@
 import unittest
-from src.robot_reboot.action import RobotRebootAction
+from src.robot_reboot.action import RobotRebootAction, get_action_by_id, get_actions
 from src.exceptions.exceptions import RequiredValueException
 from src.robot_reboot.util import Direction
 
@@ -15,3 +15,24 @@ class TestRobotRebootAction(unittest.TestCase):
 
     def test_init_fails_when_direction_is_none(self):
         self.assertRaises(RequiredValueException, lambda: RobotRebootAction(1, None))
+
+    def test_action_id(self):
+        self.assertEqual(0, RobotRebootAction(0, Direction.North).action_id)
+        self.assertEqual(3, RobotRebootAction(0, Direction.West).action_id)
+        self.assertEqual(5, RobotRebootAction(1, Direction.East).action_id)
+
+    def test_equal_actions_same_hash(self):
+        self.assertEqual(RobotRebootAction(1, Direction.West), RobotRebootAction(1, Direction.West))
+        self.assertEqual(hash(RobotRebootAction(1, Direction.West)), hash(RobotRebootAction(1, Direction.West)))
+        self.assertNotEqual(RobotRebootAction(1, Direction.West), RobotRebootAction(0, Direction.West))
+
+    def test_get_action_by_id_returns_same_instance(self):
+        action = get_action_by_id(6)
+        self.assertEqual(RobotRebootAction(1, Direction.South), action)
+        self.assertIs(action, get_action_by_id(6))
+
+    def test_get_actions_ordered_by_action_id(self):
+        actions = get_actions(4)
+        self.assertEqual(16, len(actions))
+        for i, action in enumerate(actions):
+            self.assertEqual(i, action.action_id)
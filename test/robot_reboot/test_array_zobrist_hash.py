@@ -0,0 +1,55 @@
+import pickle
+import unittest
+
+import numpy as np
+
+from src.robot_reboot.array_zobrist_hash import ArrayZobristHash
+
+
+class TestArrayZobristHash(unittest.TestCase):
+    def test_robots_count(self):
+        zobrist_hash = ArrayZobristHash(4, (31, 31))
+        self.assertEqual(4, zobrist_hash.robots_count)
+
+    def test_maze_shape(self):
+        zobrist_hash = ArrayZobristHash(2, (11, 11))
+        self.assertEqual((11, 11), zobrist_hash.maze_shape)
+        self.assertEqual((11, 11, 2), zobrist_hash.values.shape)
+
+    def test_empty(self):
+        zobrist_hash = ArrayZobristHash(4, (31, 31))
+        self.assertEqual(0, zobrist_hash.empty)
+
+    def test_get_value_for_valid_entries(self):
+        zobrist_hash = ArrayZobristHash(4, (31, 31))
+        values = set()
+        for r in range(0, 31, 2):
+            for c in range(0, 31, 2):
+                for robot in range(4):
+                    value = zobrist_hash.get_value((r, c), robot)
+                    self.assertTrue(value > 0,
+                                    "Not value found for robot " + str(robot) + " at position " + str((r, c)))
+                    values.add(value)
+        self.assertEqual(16 * 16 * 4, len(values), "Every robot should have a different value in each position")
+
+    def test_same_values_with_same_seed(self):
+        np.testing.assert_equal(ArrayZobristHash(4, (31, 31), seed=3).values,
+                                ArrayZobristHash(4, (31, 31), seed=3).values)
+        self.assertFalse(np.array_equal(ArrayZobristHash(4, (31, 31), seed=3).values,
+                                        ArrayZobristHash(4, (31, 31), seed=4).values))
+
+    def test_pickle_generates_same_values(self):
+        zobrist_hash = ArrayZobristHash(4, (31, 31), seed=3)
+        restored = pickle.loads(pickle.dumps(zobrist_hash))
+        np.testing.assert_equal(zobrist_hash.values, restored.values)
+        self.assertEqual(zobrist_hash.get_value((2, 4), 1), restored.get_value((2, 4), 1))
+
+    def test_hash_positions_matches_get_value(self):
+        zobrist_hash = ArrayZobristHash(2, (11, 11))
+        robots_positions = [[(0, 0), (2, 4)], [(10, 10), (0, 0)]]
+        hashes = zobrist_hash.hash_positions(robots_positions)
+        for i, positions in enumerate(robots_positions):
+            expected = zobrist_hash.empty
+            for robot_id, pos in enumerate(positions):
+                expected ^= zobrist_hash.get_value(pos, robot_id)
+            self.assertEqual(expected, int(hashes[i]))
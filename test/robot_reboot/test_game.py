@@ -848,6 +848,32 @@ class TestGame(unittest.TestCase):
         self.assertEqual(robots_positions, s.robots_positions, "Robots position on initial state should not be altered")
         self.assertEqual(0, s.sequence_i, "Sequence on initial state should not be altered")
 
+    def test_get_destination_same_position_as_apply(self):
+        house = RobotRebootGoalHouse(0, (0, 0))
+        maze = np.array([[0, 0, 0, 1, 0],
+                         [0, 0, 0, 0, 0],
+                         [0, 0, 0, 0, 0],
+                         [0, 0, 0, 0, 0],
+                         [0, 0, 0, 0, 0]
+                         ])
+        game = RobotRebootGame(2, maze, house)
+        s = RobotRebootState(game, [(4, 2), (0, 0)])
+        self.assertEqual((4, 0), game.get_destination(RobotRebootAction(0, Direction.West), s))
+        self.assertEqual((0, 2), game.get_destination(RobotRebootAction(1, Direction.East), s))
+        for action in game.actions:
+            self.assertEqual(game.apply(action, s).robots_positions[action.robot_id],
+                             game.get_destination(action, s))
+
+    def test_slide_all_same_positions_as_get_destination(self):
+        np.random.seed(26)
+        game, state, selected_quadrants = RobotRebootFactory().create(31)
+        for _ in range(20):
+            destinations = game.slide_all(state.robots_positions)
+            self.assertEqual(len(game.actions), len(destinations))
+            for action in game.actions:
+                self.assertEqual(game.get_destination(action, state), destinations[action.action_id])
+            state = game.apply(game.actions[np.random.randint(0, len(game.actions))], state)
+
     def test_get_valid_actions_without_north_movement_actions_when_north_wall(self):
         house = RobotRebootGoalHouse(0, (0, 0))
         maze = np.array([[0, 0, 0, 0, 0],
@@ -1000,6 +1026,34 @@ class TestGame(unittest.TestCase):
         # Moving robot 0 to West should not be valid because it would return to a previous state 1
         self.assertTrue(RobotRebootAction(0, Direction.West) in valid_actions)
 
+    def test_get_valid_actions_match_next_state_map(self):
+        house = RobotRebootGoalHouse(0, (2, 2))
+        maze = np.zeros((5, 5))
+        game = RobotRebootGame(4, maze, house)
+        game_state_1 = RobotRebootState(game, [(0, 0), (2, 2), (2, 0), (2, 4)],
+                                        zobrist_hash_generator=ClassicRobotRebootZobristHash())
+        game_state_2 = game.apply(RobotRebootAction(0, Direction.East), game_state_1)
+        next_state_map = game.get_valid_actions_next_state_map(game_state_2)
+        self.assertEqual(list(next_state_map.keys()), game.get_valid_actions(game_state_2))
+        self.assertEqual(list(next_state_map.keys()), game_state_2.get_valid_actions())
+        destinations = game.get_valid_actions_destinations_map(game_state_2)
+        self.assertEqual(list(next_state_map.keys()), list(destinations.keys()))
+        for action, next_state in next_state_map.items():
+            self.assertEqual(next_state.robots_positions[action.robot_id], destinations[action])
+
+    def test_apply_derives_zobrist_hash_from_previous_state(self):
+        house = RobotRebootGoalHouse(0, (2, 2))
+        maze = np.zeros((5, 5))
+        game = RobotRebootGame(4, maze, house)
+        zobrist_hash_generator = ClassicRobotRebootZobristHash()
+        game_state = RobotRebootState(game, [(0, 0), (2, 2), (2, 0), (2, 4)],
+                                      zobrist_hash_generator=zobrist_hash_generator)
+        for action in game.actions:
+            next_state = game.apply(action, game_state)
+            expected = RobotRebootState(game, next_state.robots_positions,
+                                        zobrist_hash_generator=zobrist_hash_generator)
+            self.assertEqual(expected.zobrist_hash, next_state.zobrist_hash)
+
     def test_get_valid_actions_other_robots_in_goal_house_are_not_allowed(self):
         house = RobotRebootGoalHouse(0, (0, 2))
         maze = np.array([[0, 1, 0, 1, 0],
@@ -1027,6 +1081,30 @@ class TestGame(unittest.TestCase):
         self.assertTrue(len(valid_actions) > 0)
 
 
+    def test_lower_bounds_shared_by_games_with_same_maze_and_goal(self):
+        maze = np.array([[0, 0, 0, 0, 0],
+                         [0, 0, 0, 0, 0],
+                         [0, 0, 0, 0, 0],
+                         [0, 0, 0, 0, 1],
+                         [0, 0, 0, 0, 0]
+                         ])
+        game_1 = RobotRebootGame(2, maze, RobotRebootGoalHouse(0, (4, 4)))
+        game_2 = RobotRebootGame(2, maze.copy(), RobotRebootGoalHouse(1, (4, 4)))
+        game_3 = RobotRebootGame(2, maze, RobotRebootGoalHouse(0, (0, 0)))
+        self.assertIs(game_1.lower_bounds, game_2.lower_bounds)
+        self.assertIsNot(game_1.lower_bounds, game_3.lower_bounds)
+
+    def test_get_lower_bound(self):
+        maze = np.array([[0, 0, 0, 0, 0],
+                         [0, 0, 0, 0, 0],
+                         [0, 0, 0, 0, 0],
+                         [0, 0, 0, 0, 1],
+                         [0, 0, 0, 0, 0]
+                         ])
+        game = RobotRebootGame(2, maze, RobotRebootGoalHouse(1, (4, 4)))
+        self.assertEqual(3, game.get_lower_bound(RobotRebootState(game, [(4, 0), (0, 4)])))
+        self.assertEqual(0, game.get_lower_bound(RobotRebootState(game, [(0, 4), (4, 4)])))
+
     def test_get_game_from_matrix(self):
         game, state, quadrants_ids = RobotRebootFactory().create(31, locate_robot_close_goal=True, n_movements=4)
         encoder = MazeAndTwoPlanesPerRobotEncoder(game)
@@ -0,0 +1,110 @@
+import unittest
+
+import numpy as np
+
+from src.robot_reboot.action import RobotRebootAction
+from src.robot_reboot.direction import Direction
+from src.robot_reboot.factory import RobotRebootFactory
+from src.robot_reboot.game import RobotRebootGame
+from src.robot_reboot.goal_house import RobotRebootGoalHouse
+from src.robot_reboot.solver import RobotRebootSolver
+from src.robot_reboot.state import RobotRebootState
+from src.robot_reboot.util import get_zobrish_hash
+
+
+def get_game_and_state():
+    """
+            |  R1 |     |     |
+            |     |     |_____|
+            |     |     |  H1 |
+    """
+    house = RobotRebootGoalHouse(0, (4, 4))
+    maze = np.array([[0, 0, 0, 0, 0],
+                     [0, 0, 0, 0, 0],
+                     [0, 0, 0, 0, 0],
+                     [0, 0, 0, 0, 1],
+                     [0, 0, 0, 0, 0]
+                     ])
+    game = RobotRebootGame(2, maze, house)
+    state = RobotRebootState(game, [(0, 0), (0, 2)])
+    return game, state
+
+
+class TestRobotRebootSolver(unittest.TestCase):
+    def test_bfs_finds_shortest_solution(self):
+        game, state = get_game_and_state()
+        result = RobotRebootSolver(game).bfs(state)
+        self.assertTrue(result.solved)
+        self.assertEqual([RobotRebootAction(0, Direction.South), RobotRebootAction(0, Direction.East)],
+                         result.actions)
+        self.assertTrue(result.nodes_expanded > 0)
+
+    def test_ida_star_finds_shortest_solution(self):
+        game, state = get_game_and_state()
+        result = RobotRebootSolver(game).ida_star(state)
+        self.assertEqual([RobotRebootAction(0, Direction.South), RobotRebootAction(0, Direction.East)],
+                         result.actions)
+
+    def test_solve_when_game_is_over(self):
+        game, state = get_game_and_state()
+        state = RobotRebootState(game, [(4, 4), (0, 2)])
+        self.assertEqual([], RobotRebootSolver(game).bfs(state).actions)
+        self.assertEqual([], RobotRebootSolver(game).ida_star(state).actions)
+
+    def test_solution_does_not_visit_previous_states(self):
+        game, state = get_game_and_state()
+        zobrist_hash_generator = get_zobrish_hash(game.robots_count, game.maze_shape)
+        # The state after moving the robot south, the first action of the shortest solution, was already played
+        previous_state = RobotRebootState(game, [(4, 0), (0, 2)], zobrist_hash_generator=zobrist_hash_generator)
+        state = RobotRebootState(game, state.robots_positions, previous_state=previous_state,
+                                 zobrist_hash_generator=zobrist_hash_generator)
+        solver = RobotRebootSolver(game)
+        for result in (solver.bfs(state), solver.ida_star(state)):
+            self.assertTrue(result.solved)
+            self.assertGreater(len(result.actions), 2)
+            next_state = state
+            for action in result.actions:
+                self.assertTrue(action in next_state.get_valid_actions())
+                next_state = next_state.apply(action)
+            self.assertTrue(game.is_over(next_state))
+
+    def test_not_solved_when_max_depth_reached(self):
+        game, state = get_game_and_state()
+        solver = RobotRebootSolver(game, max_depth=1)
+        self.assertFalse(solver.bfs(state).solved)
+        self.assertFalse(solver.ida_star(state).solved)
+
+    def test_bfs_and_ida_star_solutions_same_length_and_valid(self):
+        np.random.seed(26)
+        factory = RobotRebootFactory()
+        for _ in range(3):
+            game, state, selected_quadrants = factory.create(31, locate_robot_close_goal=True, n_movements=3,
+                                                             move_all_robots=True)
+            solver = RobotRebootSolver(game, max_depth=6)
+            bfs_result = solver.bfs(state)
+            ida_star_result = solver.ida_star(state)
+            self.assertEqual(bfs_result.solved, ida_star_result.solved)
+            if ida_star_result.solved:
+                self.assertEqual(len(bfs_result.actions), len(ida_star_result.actions))
+                for action in ida_star_result.actions:
+                    self.assertTrue(action in game.get_valid_actions_next_state_map(state))
+                    state = game.apply(action, state)
+                self.assertTrue(game.is_over(state))
+
+    def test_stopped_when_max_nodes_reached(self):
+        game, state = get_game_and_state()
+        solver = RobotRebootSolver(game)
+        for result in (solver.bfs(state, max_nodes=1), solver.ida_star(state, max_nodes=1)):
+            self.assertFalse(result.solved)
+            self.assertEqual('nodes', result.stop_reason)
+            self.assertEqual(1, result.nodes_expanded)
+
+    def test_stopped_when_timeout_reached(self):
+        game, state = get_game_and_state()
+        solver = RobotRebootSolver(game)
+        for result in (solver.bfs(state, timeout=0), solver.ida_star(state, timeout=0)):
+            self.assertFalse(result.solved)
+            self.assertEqual('time', result.stop_reason)
+            self.assertEqual(0, result.nodes_expanded)
+        self.assertIsNone(solver.bfs(state, max_nodes=100, timeout=60).stop_reason)
+        self.assertIsNone(solver.ida_star(state, max_nodes=100, timeout=60).stop_reason)
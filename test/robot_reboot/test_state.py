@@ -1,3 +1,4 @@
+import pickle
 import unittest
 
 import numpy as np
@@ -73,6 +74,22 @@ class TestRobotRebootState(unittest.TestCase):
         self.assertRaises(RobotsPositionsOnWallsPositionsExceptions,
                           lambda: RobotRebootState(RobotRebootState(get_game(n_robots=1), [(1, 0)])))
 
+    def test_init_without_validation_does_not_check_robots_positions(self):
+        s = RobotRebootState(get_game(), [(1, 0), (0, 0)], validate=False)
+        self.assertEqual([(1, 0), (0, 0)], s.robots_positions)
+
+    def test_init_has_no_instance_dict(self):
+        s = RobotRebootState(get_game(), [(0, 2), (0, 0)])
+        self.assertFalse(hasattr(s, '__dict__'))
+
+    def test_get_valid_moves_computed_once(self):
+        game = get_game(size=5)
+        s = RobotRebootState(game, [(0, 2), (0, 0)], zobrist_hash_generator=ClassicRobotRebootZobristHash())
+        valid_moves = s.get_valid_moves()
+        self.assertIs(valid_moves, s.get_valid_moves())
+        self.assertEqual(game.get_valid_moves(s), valid_moves)
+        self.assertEqual([action for action, _, _ in valid_moves], s.get_valid_actions())
+
     def test_robots_count(self):
         s = RobotRebootState(get_game(), [(0, 2), (0, 0)])
         self.assertEqual(2, s.robots_count)
@@ -114,3 +131,23 @@ class TestRobotRebootState(unittest.TestCase):
         self.assertTrue(zobrist_hash_1 in game_state_3.previous_states)
         self.assertTrue(zobrist_hash_2 in game_state_3.previous_states)
         self.assertTrue(zobrist_hash_3 in game_state_3.previous_states)
+
+    def test_init_with_zobrist_hash_uses_given_hash(self):
+        game_state = RobotRebootState(get_game(size=31, n_robots=4), [(0, 2), (4, 4), (26, 26), (26, 0)],
+                                      zobrist_hash_generator=ClassicRobotRebootZobristHash(), zobrist_hash=26)
+        self.assertEqual(26, game_state.zobrist_hash)
+        self.assertTrue(26 in game_state.previous_states)
+
+    def test_pickle_deep_state_without_previous_states_chain(self):
+        game = get_game(size=31, n_robots=2)
+        game_state = None
+        for i in range(1000):
+            robots_positions = [(2 * (i % 16), 2 * (i // 16 % 16)), (30, 30)]
+            game_state = RobotRebootState(game, robots_positions, sequence_i=i, previous_state=game_state,
+                                          zobrist_hash_generator=ClassicRobotRebootZobristHash())
+        restored = pickle.loads(pickle.dumps(game_state))
+        self.assertEqual(game_state.robots_positions, restored.robots_positions)
+        self.assertEqual(game_state.sequence_i, restored.sequence_i)
+        self.assertEqual(game_state.zobrist_hash, restored.zobrist_hash)
+        self.assertEqual(set(game_state.previous_states), set(restored.previous_states))
+        self.assertEqual(game_state.get_valid_actions(), restored.get_valid_actions())
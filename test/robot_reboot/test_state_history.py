@@ -0,0 +1,68 @@
+import pickle
+import unittest
+
+from src.robot_reboot.state_history import StateHistory, CHECKPOINT_INTERVAL
+
+
+class TestStateHistory(unittest.TestCase):
+    def test_contains_own_hash(self):
+        history = StateHistory(26)
+        self.assertTrue(26 in history)
+        self.assertFalse(27 in history)
+        self.assertEqual(1, len(history))
+
+    def test_contains_previous_hashes(self):
+        history_1 = StateHistory(1)
+        history_2 = StateHistory(2, history_1)
+        history_3 = StateHistory(3, history_2)
+        self.assertEqual({1, 2, 3}, set(history_3))
+        self.assertEqual({1, 2}, set(history_2))
+        self.assertFalse(3 in history_2)
+
+    def test_long_histories_keep_all_hashes(self):
+        history = None
+        n = CHECKPOINT_INTERVAL * 5 + 3
+        for zobrist_hash in range(n):
+            history = StateHistory(zobrist_hash, history)
+            self.assertTrue(zobrist_hash in history)
+        self.assertEqual(n, len(history))
+        for zobrist_hash in range(n):
+            self.assertTrue(zobrist_hash in history)
+        self.assertFalse(n in history)
+
+    def test_branches_do_not_share_hashes(self):
+        root = StateHistory(0)
+        branch_1 = StateHistory(1, root)
+        branch_2 = StateHistory(2, root)
+        self.assertTrue(0 in branch_1)
+        self.assertTrue(0 in branch_2)
+        self.assertFalse(2 in branch_1)
+        self.assertFalse(1 in branch_2)
+
+    def test_history_built_without_recursion(self):
+        history = None
+        for zobrist_hash in range(5000):
+            history = StateHistory(zobrist_hash, history)
+        self.assertTrue(0 in history)
+
+    def test_pickle_keeps_all_hashes_without_recursion(self):
+        history = None
+        for zobrist_hash in range(5000):
+            history = StateHistory(zobrist_hash, history)
+        restored = pickle.loads(pickle.dumps(history))
+        self.assertIsNone(restored.previous)
+        self.assertEqual(4999, restored.zobrist_hash)
+        self.assertEqual(set(history), set(restored))
+        self.assertTrue(0 in StateHistory(5000, restored))
+
+    def test_branches_after_checkpoint_keep_their_hashes(self):
+        history = None
+        for zobrist_hash in range(CHECKPOINT_INTERVAL):
+            history = StateHistory(zobrist_hash, history)
+        branches = [StateHistory(zobrist_hash, history) for zobrist_hash in range(100, 110)]
+        for zobrist_hash, branch in zip(range(100, 110), branches):
+            self.assertEqual(CHECKPOINT_INTERVAL + 1, len(branch))
+            self.assertTrue(zobrist_hash in branch)
+            self.assertTrue(0 in branch)
+            self.assertFalse(zobrist_hash + 1 in branch)
+        self.assertEqual(set(range(CHECKPOINT_INTERVAL)), set(history))
@@ -1,9 +1,10 @@
 import unittest
 import numpy as np
 
-from src.robot_reboot.classic_robot_reboot_hash import ClassicRobotRebootZobristHash
+from src.robot_reboot.array_zobrist_hash import ArrayZobristHash
 from src.robot_reboot.util import get_cell_at, Direction, join_quadrants, transpose_position_to_quadrant, build_matrix, \
-    generate_positions_except, generate_even_number, get_zobrish_hash
+    generate_positions_except, generate_even_number, get_zobrish_hash, get_slide_stops, get_lower_bounds, UNREACHABLE, \
+    get_maze_id
 
 
 class TestUtil(unittest.TestCase):
@@ -173,7 +174,60 @@ class TestUtil(unittest.TestCase):
 
     def test_get_zobrish_hash_exists(self):
         zobrish_hash = get_zobrish_hash(4, (31, 31))
-        self.assertTrue(isinstance(zobrish_hash, ClassicRobotRebootZobristHash))
+        self.assertTrue(isinstance(zobrish_hash, ArrayZobristHash))
+
+    def test_get_zobrish_hash_for_any_maze_size(self):
+        zobrish_hash = get_zobrish_hash(2, (11, 11))
+        self.assertEqual(2, zobrish_hash.robots_count)
+        self.assertEqual((11, 11), zobrish_hash.maze_shape)
+
+    def test_get_zobrish_hash_shared_for_same_values(self):
+        self.assertIs(get_zobrish_hash(4, (31, 31)), get_zobrish_hash(4, (31, 31)))
 
     def test_get_zobrish_hash_raises_error_when_not_found(self):
         self.assertRaises(KeyError, lambda: get_zobrish_hash(4, (1, 2)))
+
+    def test_get_slide_stops_stops_before_walls(self):
+        maze = np.array([[0, 0, 0, 1, 0],
+                         [0, 0, 0, 0, 0],
+                         [0, 0, 0, 0, 0],
+                         [0, 0, 1, 0, 0],
+                         [0, 0, 0, 0, 0]
+                         ])
+        stops = get_slide_stops(maze)
+        self.assertEqual(4, stops[Direction.North][4][2])
+        self.assertEqual(0, stops[Direction.North][2][2])
+        self.assertEqual(2, stops[Direction.South][0][2])
+        self.assertEqual(4, stops[Direction.South][4][2])
+        self.assertEqual(2, stops[Direction.East][0][0])
+        self.assertEqual(4, stops[Direction.West][0][4])
+        self.assertEqual(4, stops[Direction.East][2][0])
+        self.assertEqual(0, stops[Direction.West][2][4])
+
+    def test_get_lower_bounds(self):
+        maze = np.array([[0, 0, 0, 0, 0],
+                         [0, 0, 0, 0, 0],
+                         [0, 0, 0, 0, 0],
+                         [0, 0, 0, 0, 1],
+                         [0, 0, 0, 0, 0]
+                         ])
+        lower_bounds = get_lower_bounds(maze, (4, 4))
+        self.assertEqual(0, lower_bounds[4][4])
+        self.assertEqual(1, lower_bounds[4][0])
+        self.assertEqual(3, lower_bounds[0][4], "Wall between (2, 4) and (4, 4) must be surrounded")
+        self.assertEqual(2, lower_bounds[0][0])
+
+    def test_get_lower_bounds_unreachable(self):
+        maze = np.array([[0, 1, 0],
+                         [0, 1, 0],
+                         [0, 1, 0]])
+        lower_bounds = get_lower_bounds(maze, (0, 0))
+        self.assertEqual(UNREACHABLE, lower_bounds[0][2])
+        self.assertEqual(1, lower_bounds[2][0])
+
+    def test_get_maze_id(self):
+        maze = np.zeros((5, 5))
+        maze[1, 2] = 1
+        self.assertEqual(get_maze_id(maze), get_maze_id(maze.copy()))
+        self.assertNotEqual(get_maze_id(maze), get_maze_id(np.zeros((5, 5))))
+        self.assertNotEqual(get_maze_id(np.zeros((5, 5))), get_maze_id(np.zeros((7, 7))))